@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from .models import (
     Topic, ConceptTag, Attempt, Turn, NoteUpload,
     TransferScenario, TransferAttempt, TransferScaffold,
@@ -10,6 +11,12 @@ class ConceptTagInline(admin.TabularInline):
     extra = 1
 
 
+class TopicChangeList(ChangeList):
+    def get_queryset(self, request, *args, **kwargs):
+        # The list only shows name/standard/count; skip loading the JSON fields
+        return super().get_queryset(request, *args, **kwargs).only("name", "standard", "concept_count")
+
+
 @admin.register(Topic)
 class TopicAdmin(admin.ModelAdmin):
     list_display = ["name", "standard", "concept_count"]
@@ -17,9 +24,12 @@ class TopicAdmin(admin.ModelAdmin):
     search_fields = ["name", "standard"]
     inlines = [ConceptTagInline]
 
+    def get_changelist(self, request, **kwargs):
+        return TopicChangeList
+
+    @admin.display(description="# Concepts", ordering="concept_count")
     def concept_count(self, obj):
-        return len(obj.expected_concepts)
-    concept_count.short_description = "# Concepts"
+        return obj.concept_count
 
 
 class TurnInline(admin.TabularInline):
@@ -36,6 +46,10 @@ class TransferAttemptInline(admin.TabularInline):
         "transfer_score", "transfer_failure_type", "scaffold_count", "submitted_at",
     ]
 
+    def get_queryset(self, request):
+        # The "scenario" column renders TransferScenario.__str__, which reads its topic.
+        return super().get_queryset(request).select_related("scenario__topic")
+
 
 @admin.register(Attempt)
 class AttemptAdmin(admin.ModelAdmin):
@@ -43,6 +57,7 @@ class AttemptAdmin(admin.ModelAdmin):
     list_filter = ["mode", "status", "topic"]
     search_fields = ["student_name"]
     readonly_fields = ["created_at", "updated_at"]
+    list_select_related = ["topic"]
     inlines = [TurnInline, TransferAttemptInline]
 
 
@@ -50,17 +65,21 @@ class AttemptAdmin(admin.ModelAdmin):
 class TurnAdmin(admin.ModelAdmin):
     list_display = ["attempt", "turn_number", "is_correct", "created_at"]
     list_filter = ["is_correct"]
+    list_select_related = ["attempt__topic"]
+    ordering = ["attempt", "turn_number"]
 
 
 @admin.register(NoteUpload)
 class NoteUploadAdmin(admin.ModelAdmin):
     list_display = ["attempt", "uploaded_at"]
+    list_select_related = ["attempt__topic"]
 
 
 @admin.register(ConceptTag)
 class ConceptTagAdmin(admin.ModelAdmin):
     list_display = ["name", "topic", "is_misconception"]
     list_filter = ["is_misconception", "topic"]
+    list_select_related = ["topic"]
 
 
 class TransferScaffoldInline(admin.TabularInline):
@@ -74,6 +93,7 @@ class TransferScenarioAdmin(admin.ModelAdmin):
     list_display = ["topic", "transfer_level", "domain_context", "is_ai_generated", "created_at"]
     list_filter = ["transfer_level", "topic", "is_ai_generated"]
     search_fields = ["scenario_text", "domain_context"]
+    list_select_related = ["topic"]
 
 
 @admin.register(TransferAttempt)
@@ -83,6 +103,7 @@ class TransferAttemptAdmin(admin.ModelAdmin):
         "transfer_failure_type", "scaffold_count", "submitted_at",
     ]
     list_filter = ["transfer_outcome", "transfer_failure_type"]
+    list_select_related = ["attempt__topic", "scenario__topic"]
     readonly_fields = [
         "attempt", "scenario", "student_response", "transfer_outcome",
         "concept_mappings_detected", "reasoning_chain", "transfer_failure_type",
@@ -95,3 +116,4 @@ class TransferAttemptAdmin(admin.ModelAdmin):
 class TransferScaffoldAdmin(admin.ModelAdmin):
     list_display = ["transfer_attempt", "scaffold_type", "order", "helped"]
     list_filter = ["scaffold_type", "helped"]
+    list_select_related = ["transfer_attempt__attempt", "transfer_attempt__scenario"]
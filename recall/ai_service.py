@@ -5,25 +5,98 @@ Wraps OpenAI API calls behind clean functions so views stay thin.
 All prompts are carefully tuned for middle-school biology (Georgia Standards).
 """
 
-import json
 import logging
+import random
+import time
+from collections import namedtuple
+from functools import lru_cache, wraps
+from types import MappingProxyType
+
+import orjson
 from django.conf import settings
 
+from .pdf_utils import MAX_NOTES_CHARS
+
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by every request in a worker process.
+HTTP_TIMEOUT = 30.0
+CONNECT_TIMEOUT = 5.0
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 50
+
+# Retry policy for transient OpenAI failures (rate limits, dropped
+# connections, 5xx). Delays grow exponentially with full jitter so that
+# workers hitting the same 429 don't all retry at the same moment.
+MAX_ATTEMPTS = 4
+RETRY_MIN_DELAY = 1.0
+RETRY_MAX_DELAY = 20.0
+
+_client = None
+
 
 def _get_client():
-    """Lazily create an OpenAI client."""
-    from openai import OpenAI
+    """
+    Lazily create the OpenAI client, once per process.
+    Reusing it keeps the TLS connections to the API alive between requests.
+    """
+    global _client
+    if _client is None:
+        import httpx
+        from openai import OpenAI
+
+        timeout = httpx.Timeout(HTTP_TIMEOUT, connect=CONNECT_TIMEOUT)
+        # Retries are handled by _with_retries, not the SDK.
+        _client = OpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=0,
+            timeout=timeout,
+            http_client=httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                timeout=timeout,
+            ),
+        )
+    return _client
 
-    return OpenAI(api_key=settings.OPENAI_API_KEY)
+
+def _retry_delay(attempt: int) -> float:
+    """Random exponential backoff: up to 2**attempt seconds, within the bounds."""
+    ceiling = min(RETRY_MAX_DELAY, RETRY_MIN_DELAY * 2 ** attempt)
+    return max(RETRY_MIN_DELAY, random.uniform(0, ceiling))
+
+
+def _with_retries(call):
+    """Run call(), retrying transient OpenAI errors. Other errors propagate."""
+    import openai
+
+    retryable = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return call()
+        except retryable as e:
+            if attempt == MAX_ATTEMPTS:
+                raise
+            delay = _retry_delay(attempt)
+            logger.warning(
+                "OpenAI request failed with %s (attempt %d of %d), retrying in %.1fs: %s",
+                type(e).__name__, attempt, MAX_ATTEMPTS, delay, e,
+            )
+            time.sleep(delay)
 
 
 # ─── System prompts ──────────────────────────────────────────────────────────
+#
+# Each prompt is split in two system messages:
+#   SYSTEM_*  – the instructions, rubric and JSON schema. Identical on every
+#               call, so OpenAI's automatic prompt cache can reuse the prefix.
+#   CONTEXT_* – the per-call details (topic, student data), sent after it.
 
 SYSTEM_BRAIN_DUMP_ANALYSIS = """You are a supportive middle-school biology tutor aligned to the Georgia Standards of Excellence. You work within MetaBio, a low-stakes metacognitive reflection platform for middle school students.
 
-A student just did an "active recall reflection" — they typed everything they remember about the topic "{topic_name}" (standard {standard}).
+A student just did an "active recall reflection" — they typed everything they remember about the topic given in the session context that follows these instructions.
 
 Your job:
 1. Identify which expected concepts the student demonstrated understanding of.
@@ -37,7 +110,7 @@ Your job:
    - GOOD correction: "You matched humans with Bacteria, but that's not quite right — Bacteria is a domain of tiny single-celled organisms without a nucleus. Humans actually belong to domain Eukarya."
 5. Detect UNCERTAINTY or HESITATION in the student's language (e.g., "I think maybe...", "I'm not sure but...", "probably", "might be"). Note which concepts the student seems unsure about — these are important signals for follow-up.
 6. Check whether the student demonstrates the REASONING PATTERNS expected for this topic (explaining mechanisms, causal relationships, or system-level connections), not just listing vocabulary.
-7. Generate ONE targeted follow-up question that probes the most critical gap. When possible, draw from these teacher-designed prompts: {supportive_followup_prompts}
+7. Generate ONE targeted follow-up question that probes the most critical gap. When possible, draw from the teacher-designed follow-up prompts in the session context.
 8. Keep language encouraging, low-stakes, and at a 6th-8th grade reading level. This is NOT a test — it's a reflection tool.
 
 CRITICAL RULES FOR DEMONSTRATED CONCEPTS:
@@ -61,6 +134,25 @@ CRITICAL RULES FOR FOLLOW-UP QUESTIONS:
 - BAD example: "What does the mitochondria do — it produces energy, right?"
 - GOOD example: "There's an organelle nicknamed the 'powerhouse of the cell.' Do you know which one that is and what it does?"
 
+Respond ONLY with valid JSON in this exact structure:
+{
+  "demonstrated_concepts": ["concept1", "concept2"],
+  "missing_concepts": ["concept3", "concept4"],
+  "misconceptions": [
+    {"claim": "what the student said wrong", "correction": "short age-appropriate correction"}
+  ],
+  "uncertain_concepts": ["concepts the student seemed unsure about"],
+  "reasoning_depth": "surface|partial|strong",
+  "overall_feedback": "1-2 encouraging sentences about what they got right. Use warm, non-evaluative language.",
+  "follow_up_question": "One targeted question probing the biggest gap.",
+  "is_correct": null
+}
+"""
+
+CONTEXT_BRAIN_DUMP_ANALYSIS = """Session context
+
+Topic: "{topic_name}" (standard {standard})
+
 Expected concepts for this topic:
 {expected_concepts}
 
@@ -70,30 +162,16 @@ Common misconceptions to watch for:
 Expected reasoning patterns students should demonstrate:
 {expected_reasoning_patterns}
 
+Teacher-designed follow-up prompts:
+{supportive_followup_prompts}
+
 Teacher-provided concise explanations for clarifying misunderstandings:
 {concise_explanations}
-
-Respond ONLY with valid JSON in this exact structure:
-{{
-  "demonstrated_concepts": ["concept1", "concept2"],
-  "missing_concepts": ["concept3", "concept4"],
-  "misconceptions": [
-    {{"claim": "what the student said wrong", "correction": "short age-appropriate correction"}}
-  ],
-  "uncertain_concepts": ["concepts the student seemed unsure about"],
-  "reasoning_depth": "surface|partial|strong",
-  "overall_feedback": "1-2 encouraging sentences about what they got right. Use warm, non-evaluative language.",
-  "follow_up_question": "One targeted question probing the biggest gap.",
-  "is_correct": null
-}}
 """
 
 SYSTEM_FOLLOWUP_ANALYSIS = """You are a supportive middle-school biology tutor aligned to the Georgia Standards of Excellence, working within MetaBio, a low-stakes metacognitive reflection platform.
 
-The student is working on the topic "{topic_name}" (standard {standard}).
-
-Here is the conversation so far:
-{conversation_history}
+The session context that follows these instructions gives the topic the student is working on and the conversation so far.
 
 The student just answered a follow-up question. Evaluate their answer:
 1. Is their response correct or mostly correct? (is_correct: true/false)
@@ -106,7 +184,7 @@ The student just answered a follow-up question. Evaluate their answer:
 3. Detect UNCERTAINTY or HESITATION in the student's language (e.g., "I think...", "maybe", "not sure"). Note these as signals rather than treating them as errors.
 4. Check whether the student is explaining mechanisms and relationships (reasoning depth), not just listing vocabulary terms.
 5. Update the lists of demonstrated, missing, and misconceived concepts.
-6. If there are still gaps, generate ONE new follow-up question. When possible, draw from: {supportive_followup_prompts}
+6. If there are still gaps, generate ONE new follow-up question. When possible, draw from the teacher-designed follow-up prompts in the session context.
 7. If the student has shown strong understanding, say so encouragingly — celebrate their growth!
 8. IMPORTANT — PROBE-CREDITED CONCEPTS: If a concept was NOT demonstrated in the student's initial brain dump but is NOW demonstrated only because this follow-up question guided them to the answer, list that concept in "probe_credited_concepts". These are concepts the student needed a nudge to recall — they should get credit but also be flagged for review in the summary.
 
@@ -134,18 +212,12 @@ LANGUAGE GUIDELINES:
 - Emphasize growth and revision rather than judgment.
 - Keep explanations concise (2-3 sentences max).
 
-Expected concepts for this topic:
-{expected_concepts}
-
-Expected reasoning patterns:
-{expected_reasoning_patterns}
-
 Respond ONLY with valid JSON in this exact structure:
-{{
+{
   "demonstrated_concepts": ["concept1", "concept2"],
   "missing_concepts": ["concept3"],
   "misconceptions": [
-    {{"claim": "what was wrong", "correction": "short correction"}}
+    {"claim": "what was wrong", "correction": "short correction"}
   ],
   "uncertain_concepts": ["concepts the student seemed unsure about"],
   "reasoning_depth": "surface|partial|strong",
@@ -153,66 +225,69 @@ Respond ONLY with valid JSON in this exact structure:
   "follow_up_question": "Next probing question, or empty string if mastery is near.",
   "is_correct": true,
   "probe_credited_concepts": ["concepts newly demonstrated ONLY because of this follow-up probe"]
-}}
+}
 """
 
-SYSTEM_NOTES_EXTRACTION = """You are a middle-school biology curriculum specialist aligned to the Georgia Standards of Excellence.
-
-A student uploaded their class notes (text below). Extract the key biology concepts present in the notes.
+CONTEXT_FOLLOWUP_ANALYSIS = """Session context
 
 Topic: "{topic_name}" (standard {standard})
 
 Expected concepts for this topic:
 {expected_concepts}
 
-From the student's notes, identify:
-1. Which expected concepts are COVERED in the notes.
-2. Which expected concepts are MISSING from the notes.
-3. Any statements in the notes that reflect MISCONCEPTIONS.
+Expected reasoning patterns:
+{expected_reasoning_patterns}
 
-Respond ONLY with valid JSON:
-{{
-  "covered_concepts": ["concept1", "concept2"],
-  "missing_concepts": ["concept3"],
-  "misconceptions": [
-    {{"claim": "what the notes say wrong", "correction": "short correction"}}
-  ]
-}}
+Teacher-designed follow-up prompts:
+{supportive_followup_prompts}
+
+Here is the conversation so far:
+{conversation_history}
 """
 
-SYSTEM_QUIZ_GENERATION = """You are a supportive middle-school biology tutor creating a low-stakes quiz.
+CONTEXT_NOTES_EXTRACTION = """Session context
 
 Topic: "{topic_name}" (standard {standard})
 
-Based on the student's notes analysis:
-- Covered concepts: {covered_concepts}
-- Missing concepts: {missing_concepts}
-- Misconceptions: {misconceptions}
+Expected concepts for this topic:
+{expected_concepts}
+"""
+
+SYSTEM_NOTES_QUIZ = """You are a supportive middle-school biology tutor aligned to the Georgia Standards of Excellence, creating a low-stakes quiz from a student's class notes.
+
+A student uploaded their class notes (sent as the user message). The topic and its expected concepts are given in the session context that follows these instructions.
+
+Step 1 — analyse the notes. Identify:
+1. Which expected concepts are COVERED in the notes.
+2. Which expected concepts are MISSING from the notes.
+3. Any statements in the notes that reflect MISCONCEPTIONS.
 
-Generate exactly {num_questions} short-answer questions that:
+Step 2 — write the quiz. Generate one short-answer question per missing concept or misconception, but never fewer than 3 or more than 6 questions in total. The questions must:
 1. Focus on MISSING concepts and MISCONCEPTIONS (prioritize gaps).
 2. Use age-appropriate language (grades 6-8).
 3. Require conceptual understanding, not just vocabulary recall.
-4. Are encouraging and low-stakes in tone.
+4. Be encouraging and low-stakes in tone.
 
 Respond ONLY with valid JSON:
-{{
+{
+  "covered_concepts": ["concept1", "concept2"],
+  "missing_concepts": ["concept3"],
+  "misconceptions": [
+    {"claim": "what the notes say wrong", "correction": "short correction"}
+  ],
   "questions": [
-    {{
+    {
       "question": "The question text",
       "target_concept": "which concept this tests",
       "hint": "A small hint if the student is stuck"
-    }}
+    }
   ]
-}}
+}
 """
 
 SYSTEM_QUIZ_EVALUATION = """You are a supportive middle-school biology tutor evaluating a quiz answer within MetaBio, a low-stakes reflection platform.
 
-Topic: "{topic_name}" (standard {standard})
-Question: "{question}"
-Target concept: "{target_concept}"
-Student's answer: "{student_answer}"
+The session context that follows these instructions gives the topic, the question, the concept it targets, and the student's answer.
 
 Evaluate the student's answer:
 1. Is it correct or mostly correct?
@@ -222,25 +297,25 @@ Evaluate the student's answer:
 5. Focus on conceptual understanding, not just vocabulary recall.
 
 Respond ONLY with valid JSON:
-{{
+{
   "is_correct": true,
   "feedback": "Encouraging, growth-focused feedback about their answer.",
   "correct_answer": "The complete correct answer for reference.",
   "concept_demonstrated": true
-}}
+}
 """
 
-SYSTEM_SUMMARY = """You are a supportive middle-school biology tutor writing a session summary for MetaBio, a low-stakes metacognitive reflection platform.
+CONTEXT_QUIZ_EVALUATION = """Session context
 
 Topic: "{topic_name}" (standard {standard})
-Session mode: {mode}
-Turns completed: {turn_count}
-End reason: {end_reason}
+Question: "{question}"
+Target concept: "{target_concept}"
+Student's answer: "{student_answer}"
+"""
 
-Concepts the student demonstrated: {demonstrated}
-Concepts still missing: {missing}
-Misconceptions identified: {misconceptions}
-Concepts demonstrated only after a hint/nudge (probed): {probed}
+SYSTEM_SUMMARY = """You are a supportive middle-school biology tutor writing a session summary for MetaBio, a low-stakes metacognitive reflection platform.
+
+The session context that follows these instructions describes the session: topic, mode, turns completed, why it ended, and which concepts were demonstrated, missing, misconceived, or probed.
 
 Write a brief, encouraging summary (4-6 sentences) that:
 1. Celebrates what the student explained well — emphasize the quality of their thinking, not just getting answers right.
@@ -253,14 +328,75 @@ Write a brief, encouraging summary (4-6 sentences) that:
 5. Emphasizes that noticing confusion is a sign of strong metacognitive thinking — it's good to discover what you don't know yet!
 
 Respond ONLY with valid JSON:
-{{
+{
   "what_you_know_well": ["concept1", "concept2"],
   "needed_a_nudge": ["concepts the student got right only after a probing question"],
   "what_to_review_next": ["concept3"],
   "summary_text": "The encouraging summary paragraph.",
   "reflection_prompt": "A thought-provoking reflection question about what surprised the student.",
   "study_strategy_prompt": "A metacognitive question about how the student would study this topic differently next time."
-}}
+}
+"""
+
+CONTEXT_SUMMARY = """Session context
+
+Topic: "{topic_name}" (standard {standard})
+Session mode: {mode}
+Turns completed: {turn_count}
+End reason: {end_reason}
+
+Concepts the student demonstrated: {demonstrated}
+Concepts still missing: {missing}
+Misconceptions identified: {misconceptions}
+Concepts demonstrated only after a hint/nudge (probed): {probed}
+"""
+
+# Attempt.status → the end reason given to the summary prompt.
+END_REASON_MAP = MappingProxyType({
+    "mastery": "Student reached mastery",
+    "max_turns": "Maximum turns reached",
+    "opted_out": "Student chose to stop",
+    "active": "Session still active",
+})
+
+# On the final turn of a Mode 1 session the follow-up analysis and the
+# session summary are requested in one call. The prompt reuses the follow-up
+# rules and both JSON structures above so the three prompts can't drift apart.
+_FOLLOWUP_RULES, _FOLLOWUP_SCHEMA = SYSTEM_FOLLOWUP_ANALYSIS.split(
+    "Respond ONLY with valid JSON in this exact structure:\n"
+)
+_SUMMARY_SCHEMA = SYSTEM_SUMMARY.split("Respond ONLY with valid JSON:\n")[1]
+
+SYSTEM_FOLLOWUP_OR_SUMMARY = _FOLLOWUP_RULES + """FINAL TURN:
+This is the student's final turn. Evaluate their answer as described above, THEN write the end-of-session summary based on your updated analysis and the session progress in the session context.
+
+SESSION SUMMARY RULES:
+1. Write a brief, encouraging summary (4-6 sentences) that celebrates what the student explained well — emphasize the quality of their thinking, not just getting answers right.
+2. Gently name 1-2 areas to review, framing them as opportunities to learn more (not failures).
+3. Any probed or probe-credited concept belongs in "needed_a_nudge" — the student got there with a little prompting and should practice recalling it on their own next time.
+4. Include a "what surprised you" reflection prompt and a "what would you study differently" prompt.
+5. Emphasize that noticing confusion is a sign of strong metacognitive thinking.
+
+The follow-up analysis object has this structure:
+""" + _FOLLOWUP_SCHEMA + """
+The summary object has this structure:
+""" + _SUMMARY_SCHEMA + """
+Respond ONLY with valid JSON in this exact structure:
+{
+  "followup": {the follow-up analysis object},
+  "summary": {the summary object}
+}
+"""
+
+# Appended to the follow-up context on the final turn.
+CONTEXT_FOLLOWUP_OR_SUMMARY = """
+Session progress before this answer:
+Session mode: {mode}
+Turns completed: {turn_count} of {max_turns}
+Concepts demonstrated so far: {demonstrated}
+Concepts still missing: {missing}
+Misconceptions identified so far: {misconceptions}
+Concepts demonstrated only after a hint/nudge (probed): {probed}
 """
 
 
@@ -268,12 +404,9 @@ Respond ONLY with valid JSON:
 
 SYSTEM_TRANSFER_SCENARIO = """You are an expert instructional designer creating a TRANSFER CHALLENGE for a middle-school biology student.
 
-The student has been learning about the topic "{topic_name}" (standard {standard}).
-
-Expected concepts for this topic:
-{expected_concepts}
+The session context that follows these instructions gives the topic the student has been learning, its expected concepts, and the transfer level to target.
 
-Your job: Generate a scenario at **Transfer Level {level}** that tests whether the student can APPLY these concepts in a novel context.
+Your job: Generate a scenario at the requested transfer level that tests whether the student can APPLY these concepts in a novel context.
 
 TRANSFER LEVELS:
 - Level 1 (Near Transfer): Same biology domain, slightly different context. Example: If they learned about osmosis in plant cells, ask about it in animal cells.
@@ -291,42 +424,34 @@ CRITICAL RULES:
 6. The scenario should be engaging and interesting for a middle-schooler.
 
 Respond ONLY with valid JSON:
-{{
+{
   "scenario_text": "The scenario prompt shown to the student",
   "domain_context": "e.g., food science, engineering, space, sports",
   "target_concepts": ["which concepts from the topic this tests"],
   "expected_mappings": [
-    {{
+    {
       "source_concept": "the biology concept",
       "target_element": "what it maps to in the scenario",
       "structural_principle": "the underlying principle being transferred"
-    }}
+    }
   ],
   "surface_distractors": ["things a student might fixate on that are irrelevant"]
-}}
+}
 """
 
-SYSTEM_TRANSFER_DIAGNOSIS = """You are an expert at diagnosing KNOWLEDGE TRANSFER in middle-school biology students.
+CONTEXT_TRANSFER_SCENARIO = """Session context
 
 Topic: "{topic_name}" (standard {standard})
-Expected concepts: {expected_concepts}
-
-The student was given this transfer scenario:
-"{scenario_text}"
 
-Domain: {domain_context}
-
-Expected concept mappings (what a successful transfer would look like):
-{expected_mappings}
+Expected concepts for this topic:
+{expected_concepts}
 
-Surface distractors (irrelevant features the student might fixate on):
-{surface_distractors}
+Target transfer level: Level {level}
+"""
 
-Previous scaffolds given to the student (if any):
-{scaffolds_given}
+SYSTEM_TRANSFER_DIAGNOSIS = """You are an expert at diagnosing KNOWLEDGE TRANSFER in middle-school biology students.
 
-The student wrote:
-"{student_response}"
+The session context that follows these instructions gives the topic and its expected concepts, the transfer scenario the student was given, the expected concept mappings, surface distractors, any scaffolds already given, and what the student wrote.
 
 Analyze the student's response carefully. BE STRICT — your job is to verify GENUINE understanding, not give credit for lucky guesses or parroting.
 
@@ -355,45 +480,55 @@ Analyze the student's response carefully. BE STRICT — your job is to verify GE
 4. FEEDBACK: Write 2-3 encouraging sentences explaining what the student did well and where they could improve. Keep language at a 6th-8th grade level. Be specific about WHAT they connected and what they missed. If the student merely echoed scenario language, gently point out that you want them to explain the BIOLOGY behind their answer, not just pick the obvious choice from the scenario.
 
 Respond ONLY with valid JSON:
-{{
+{
   "transfer_outcome": "no_transfer|surface|partial|structural|creative",
   "concept_mappings_detected": [
-    {{
+    {
       "source_concept": "the biology concept",
       "target_element": "what the student connected it to",
       "quality": "surface|structural|creative"
-    }}
+    }
   ],
   "concept_mappings_missed": [
-    {{
+    {
       "source_concept": "the biology concept they missed",
       "target_element": "what it should map to"
-    }}
+    }
   ],
   "reasoning_chain": ["step 1 of your analysis", "step 2", "step 3"],
   "transfer_failure_type": "none|fixation|encapsulation|overgeneralization|fragmentation|inert_knowledge",
   "transfer_failure_diagnosis": "Human-readable explanation of why transfer failed (or empty if successful)",
   "overall_feedback": "2-3 encouraging sentences for the student",
   "transfer_score": 0.0
-}}
+}
 """
 
-SYSTEM_TRANSFER_SCAFFOLD = """You are a supportive middle-school biology tutor helping a student who is STUCK on a transfer challenge.
+CONTEXT_TRANSFER_DIAGNOSIS = """Session context
 
 Topic: "{topic_name}" (standard {standard})
+Expected concepts: {expected_concepts}
 
-The student was given this scenario:
+The student was given this transfer scenario:
 "{scenario_text}"
 
-Their response: "{student_response}"
+Domain: {domain_context}
 
-Their transfer failure type: {failure_type}
-Diagnosis: {failure_diagnosis}
+Expected concept mappings (what a successful transfer would look like):
+{expected_mappings}
 
-Previous scaffolds already given (don't repeat these):
-{previous_scaffolds}
+Surface distractors (irrelevant features the student might fixate on):
+{surface_distractors}
 
-This is scaffold #{scaffold_number}.
+Previous scaffolds given to the student (if any):
+{scaffolds_given}
+
+The student wrote:
+"{student_response}"
+"""
+
+SYSTEM_TRANSFER_SCAFFOLD = """You are a supportive middle-school biology tutor helping a student who is STUCK on a transfer challenge.
+
+The session context that follows these instructions gives the topic, the scenario, the student's response, their transfer failure type and diagnosis, the scaffolds already given (don't repeat these), and which scaffold number this is.
 
 Based on the failure type, generate a HINT (not the answer!) using this strategy:
 
@@ -411,49 +546,274 @@ CRITICAL RULES:
 5. Each progressive scaffold should give slightly more direction than the last.
 
 Respond ONLY with valid JSON:
-{{
+{
   "scaffold_type": "analogy_prompt|structure_hint|constraint_removal|bridging_context|explicit_mapping",
   "scaffold_text": "The hint text to show the student"
-}}
+}
+"""
+
+CONTEXT_TRANSFER_SCAFFOLD = """Session context
+
+Topic: "{topic_name}" (standard {standard})
+
+The student was given this scenario:
+"{scenario_text}"
+
+Their response: "{student_response}"
+
+Their transfer failure type: {failure_type}
+Diagnosis: {failure_diagnosis}
+
+Previous scaffolds already given (don't repeat these):
+{previous_scaffolds}
+
+This is scaffold #{scaffold_number}.
 """
 
 
 # ─── API call helpers ─────────────────────────────────────────────────────────
 
-def _chat(system_prompt: str, user_message: str, max_tokens: int = 1500) -> dict:
+# The static system message for each prompt, built once and shared by every
+# request that uses it rather than rebuilt per call.
+_SYSTEM_MESSAGES = {
+    prompt: {"role": "system", "content": prompt}
+    for prompt in (
+        SYSTEM_BRAIN_DUMP_ANALYSIS,
+        SYSTEM_FOLLOWUP_ANALYSIS,
+        SYSTEM_FOLLOWUP_OR_SUMMARY,
+        SYSTEM_NOTES_QUIZ,
+        SYSTEM_QUIZ_EVALUATION,
+        SYSTEM_SUMMARY,
+        SYSTEM_TRANSFER_SCENARIO,
+        SYSTEM_TRANSFER_DIAGNOSIS,
+        SYSTEM_TRANSFER_SCAFFOLD,
+    )
+}
+
+
+def _dumps(value) -> str:
+    """Serialise a value to compact JSON text for prompt interpolation."""
+    return orjson.dumps(value).decode()
+
+
+def _request_body(system_prompt: str, context: str, user_message: str,
+                  max_tokens: int = 1500, temperature: float = None) -> dict:
     """
-    Send a chat completion request and parse the JSON response.
+    Build the chat completion parameters shared by every call path.
+    The static instructions go first and the per-call context second, so
+    every call with the same SYSTEM_* prompt shares a cacheable prefix.
+    JSON mode guarantees the reply is a bare JSON object (no code fences).
+    """
+    body = {
+        "model": "gpt-4o-mini",
+        "messages": [
+            _SYSTEM_MESSAGES.get(system_prompt) or {"role": "system", "content": system_prompt},
+            {"role": "system", "content": context},
+            {"role": "user", "content": user_message},
+        ],
+        "max_completion_tokens": max_tokens,
+        "response_format": {"type": "json_object"},
+    }
+    if temperature is not None:
+        body["temperature"] = temperature
+    return body
+
+
+def _parse_content(content, finish_reason=None) -> dict:
+    """
+    Parse the JSON text of a chat completion message.
     Returns a dict on success, or a dict with an 'error' key on failure.
     """
-    client = _get_client()
+    if not content:
+        logger.error("OpenAI returned empty content. Finish reason: %s", finish_reason)
+        return {"error": "AI returned an empty response. Please try again."}
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message},
-            ],
-            max_completion_tokens=max_tokens,
+        return orjson.loads(content)
+    except orjson.JSONDecodeError as e:
+        # finish_reason "length" means max_tokens cut the JSON short
+        logger.error(
+            "Failed to parse AI JSON response: %s (finish reason: %s)\nRaw: %s",
+            e, finish_reason, content,
         )
-        content = response.choices[0].message.content
-        if not content:
-            logger.error("OpenAI returned empty content. Finish reason: %s",
-                         response.choices[0].finish_reason)
-            return {"error": "AI returned an empty response. Please try again."}
-        content = content.strip()
-        # Strip markdown code fences if present
-        if content.startswith("```"):
-            content = content.split("\n", 1)[1]  # remove first line
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-        return json.loads(content)
-    except json.JSONDecodeError as e:
-        logger.error("Failed to parse AI JSON response: %s\nRaw: %s", e, content)
         return {"error": f"Failed to parse AI response: {e}"}
+
+
+def _json_object_end(text: str, state: list) -> int:
+    """
+    Scan a streamed chunk for the end of the top-level JSON object.
+    state is [depth, in_string, escaped], carried between chunks.
+    Returns the index just past the closing brace, or -1 if not closed yet.
+    """
+    depth, in_string, escaped = state
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"' and depth:
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                state[:] = [depth, in_string, escaped]
+                return i + 1
+    state[:] = [depth, in_string, escaped]
+    return -1
+
+
+def _chat_stream(system_prompt: str, context: str, user_message: str,
+                 max_tokens: int = 1500, temperature: float = None):
+    """
+    Stream a chat completion, yielding (text, finish_reason) for each
+    delta as it arrives; finish_reason is None until the last chunk.
+    Closing the generator early closes the HTTP stream, which stops
+    generation on OpenAI's side.
+    """
+    client = _get_client()
+    stream = client.chat.completions.create(
+        **_request_body(system_prompt, context, user_message, max_tokens, temperature),
+        stream=True,
+    )
+    try:
+        for chunk in stream:
+            if chunk.choices:
+                choice = chunk.choices[0]
+                yield choice.delta.content or "", choice.finish_reason
+    finally:
+        stream.close()
+
+
+def _stream_json(system_prompt: str, context: str, user_message: str,
+                 max_tokens: int = 1500, temperature: float = None) -> tuple:
+    """
+    Stream a chat completion and return (text, finish_reason), with the
+    text cut at the end of the top-level JSON object so trailing output is
+    never waited for. finish_reason is None when the stream was cut early.
+    """
+    parts = []
+    state = [0, False, False]
+    finish_reason = None
+    stream = _chat_stream(system_prompt, context, user_message, max_tokens, temperature)
+    for delta, finish_reason in stream:
+        end = _json_object_end(delta, state)
+        if end != -1:
+            parts.append(delta[:end])
+            stream.close()
+            break
+        parts.append(delta)
+    return "".join(parts), finish_reason
+
+
+def _chat(system_prompt: str, context: str, user_message: str,
+          max_tokens: int = 1500, temperature: float = None) -> dict:
+    """
+    Send a chat completion request and parse the JSON response.
+    Transient failures are retried with backoff; a failed attempt
+    restarts the stream from scratch.
+    Returns a dict on success, or a dict with an 'error' key on failure.
+    """
+    try:
+        content, finish_reason = _with_retries(lambda: _stream_json(
+            system_prompt, context, user_message, max_tokens, temperature
+        ))
     except Exception as e:
         logger.error("OpenAI API error: %s", e)
         return {"error": f"AI service error: {e}"}
+    return _parse_content(content, finish_reason)
+
+
+# ─── Per-topic prompt cache ───────────────────────────────────────────────────
+#
+# Topic fields only change when a teacher edits a topic, so their JSON
+# serialisations and any context block built purely from them are cached.
+# The caches are per process and keyed on (pk, updated_at): a topic saved
+# by any process, or by a QuerySet.update() that sets updated_at, gets
+# fresh prompts on its next load. The Topic signals in recall.signals also
+# clear them, which frees the stale entries in the saving process.
+
+TopicPayload = namedtuple("TopicPayload", [
+    "topic_name",
+    "standard",
+    "expected_concepts",
+    "common_misconceptions",
+    "expected_reasoning_patterns",
+    "supportive_followup_prompts",
+    "concise_explanations",
+])
+
+# The follow-up context is split around its only per-call field, so each turn
+# is a concatenation of cached text rather than a full template format.
+_FOLLOWUP_HEAD, _FOLLOWUP_TAIL = CONTEXT_FOLLOWUP_ANALYSIS.split("{conversation_history}")
+
+
+def _topic_cache(maxsize):
+    """
+    lru_cache for a function whose first argument is a Topic. The topic's
+    updated_at is part of the key, so an edited topic misses the cache.
+    """
+    def decorator(func):
+        @lru_cache(maxsize=maxsize)
+        def cached(topic, updated_at, *args):
+            return func(topic, *args)
+
+        @wraps(func)
+        def wrapper(topic, *args):
+            return cached(topic, topic.updated_at, *args)
+
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+    return decorator
+
+
+@_topic_cache(maxsize=64)
+def _topic_payload(topic) -> TopicPayload:
+    """Serialise the topic fields that the prompts interpolate."""
+    return TopicPayload(
+        topic_name=topic.name,
+        standard=topic.standard,
+        expected_concepts=_dumps(topic.expected_concepts),
+        common_misconceptions=_dumps(topic.common_misconceptions),
+        expected_reasoning_patterns=_dumps(getattr(topic, 'expected_reasoning_patterns', []) or []),
+        supportive_followup_prompts=_dumps(getattr(topic, 'supportive_followup_prompts', []) or []),
+        concise_explanations=_dumps(getattr(topic, 'concise_explanations', []) or []),
+    )
+
+
+@_topic_cache(maxsize=64)
+def _brain_dump_context(topic) -> str:
+    return CONTEXT_BRAIN_DUMP_ANALYSIS.format(**_topic_payload(topic)._asdict())
+
+
+@_topic_cache(maxsize=64)
+def _followup_context_parts(topic) -> tuple:
+    fields = _topic_payload(topic)._asdict()
+    return _FOLLOWUP_HEAD.format(**fields), _FOLLOWUP_TAIL.format(**fields)
+
+
+@_topic_cache(maxsize=64)
+def _notes_extraction_context(topic) -> str:
+    return CONTEXT_NOTES_EXTRACTION.format(**_topic_payload(topic)._asdict())
+
+
+@_topic_cache(maxsize=256)
+def _transfer_scenario_context(topic, transfer_level: int) -> str:
+    return CONTEXT_TRANSFER_SCENARIO.format(
+        **_topic_payload(topic)._asdict(), level=transfer_level,
+    )
+
+
+def clear_topic_cache():
+    """Drop every cached per-topic prompt (called when a Topic changes)."""
+    _topic_payload.cache_clear()
+    _brain_dump_context.cache_clear()
+    _followup_context_parts.cache_clear()
+    _notes_extraction_context.cache_clear()
+    _transfer_scenario_context.cache_clear()
 
 
 # ─── Public functions used by views ───────────────────────────────────────────
@@ -463,96 +823,109 @@ def analyze_brain_dump(topic, student_text: str) -> dict:
     Mode 1, Turn 1: analyze a student's initial active recall reflection.
     Returns structured feedback dict.
     """
-    system = SYSTEM_BRAIN_DUMP_ANALYSIS.format(
-        topic_name=topic.name,
-        standard=topic.standard,
-        expected_concepts=json.dumps(topic.expected_concepts),
-        common_misconceptions=json.dumps(topic.common_misconceptions),
-        expected_reasoning_patterns=json.dumps(getattr(topic, 'expected_reasoning_patterns', []) or []),
-        supportive_followup_prompts=json.dumps(getattr(topic, 'supportive_followup_prompts', []) or []),
-        concise_explanations=json.dumps(getattr(topic, 'concise_explanations', []) or []),
+    return _chat(
+        SYSTEM_BRAIN_DUMP_ANALYSIS,
+        _brain_dump_context(topic),
+        f"Student's active recall reflection:\n\n{student_text}",
     )
-    return _chat(system, f"Student's active recall reflection:\n\n{student_text}")
 
 
 def analyze_followup(topic, conversation_history: str, student_response: str) -> dict:
     """
     Mode 1, Turn 2+: analyze a student's follow-up answer.
     """
-    system = SYSTEM_FOLLOWUP_ANALYSIS.format(
-        topic_name=topic.name,
-        standard=topic.standard,
-        conversation_history=conversation_history,
-        expected_concepts=json.dumps(topic.expected_concepts),
-        expected_reasoning_patterns=json.dumps(getattr(topic, 'expected_reasoning_patterns', []) or []),
-        supportive_followup_prompts=json.dumps(getattr(topic, 'supportive_followup_prompts', []) or []),
+    head, tail = _followup_context_parts(topic)
+    return _chat(
+        SYSTEM_FOLLOWUP_ANALYSIS,
+        head + conversation_history + tail,
+        f"Student's response:\n\n{student_response}",
+        temperature=0,
     )
-    return _chat(system, f"Student's response:\n\n{student_response}")
 
 
-def extract_notes_concepts(topic, notes_text: str) -> dict:
+def analyze_followup_maybe_summary(attempt, conversation_history: str, student_response: str,
+                                   is_likely_last_turn: bool) -> tuple:
     """
-    Mode 2: extract concepts from uploaded notes.
+    Mode 1, Turn 2+: analyze a follow-up answer, and on the session's last
+    turn also write the end-of-session summary in the same call.
+    Returns (feedback, summary); summary is None unless it was generated.
     """
-    system = SYSTEM_NOTES_EXTRACTION.format(
-        topic_name=topic.name,
-        standard=topic.standard,
-        expected_concepts=json.dumps(topic.expected_concepts),
+    topic = attempt.topic
+    if not is_likely_last_turn:
+        return analyze_followup(topic, conversation_history, student_response), None
+
+    head, tail = _followup_context_parts(topic)
+    context = head + conversation_history + tail + CONTEXT_FOLLOWUP_OR_SUMMARY.format(
+        mode=attempt.get_mode_display(),
+        turn_count=attempt.turn_count,
+        max_turns=attempt.max_turns,
+        demonstrated=_dumps(attempt.demonstrated_concepts),
+        missing=_dumps(attempt.missing_concepts),
+        misconceptions=_dumps(attempt.identified_misconceptions),
+        probed=_dumps(attempt.probed_concepts),
     )
-    return _chat(system, f"Student's notes:\n\n{notes_text[:4000]}")  # truncate very long notes
+    result = _chat(
+        SYSTEM_FOLLOWUP_OR_SUMMARY,
+        context,
+        f"Student's response:\n\n{student_response}",
+        max_tokens=2500,
+        temperature=0,
+    )
+    if "error" in result:
+        return result, None
+
+    feedback = result.get("followup")
+    if not isinstance(feedback, dict):
+        logger.error("Combined follow-up response had no followup object: %s", result)
+        return {"error": "AI response was missing the follow-up analysis."}, None
 
+    summary = result.get("summary")
+    return feedback, summary if isinstance(summary, dict) else None
 
-def generate_quiz_questions(topic, covered, missing, misconceptions, num_questions=4) -> dict:
+
+def extract_and_quiz(topic, notes_text: str) -> dict:
     """
-    Mode 2: generate quiz questions based on notes analysis.
+    Mode 2: analyse uploaded notes and write the quiz in a single call.
+    Returns covered_concepts, missing_concepts, misconceptions and questions.
     """
-    system = SYSTEM_QUIZ_GENERATION.format(
-        topic_name=topic.name,
-        standard=topic.standard,
-        covered_concepts=json.dumps(covered),
-        missing_concepts=json.dumps(missing),
-        misconceptions=json.dumps(misconceptions),
-        num_questions=num_questions,
+    return _chat(
+        SYSTEM_NOTES_QUIZ,
+        _notes_extraction_context(topic),
+        f"Student's notes:\n\n{notes_text[:MAX_NOTES_CHARS]}",
+        max_tokens=2000,
     )
-    return _chat(system, "Generate the quiz questions now.")
 
 
 def evaluate_quiz_answer(topic, question: str, target_concept: str, student_answer: str) -> dict:
     """
     Mode 2: evaluate a single quiz answer.
     """
-    system = SYSTEM_QUIZ_EVALUATION.format(
+    context = CONTEXT_QUIZ_EVALUATION.format(
         topic_name=topic.name,
         standard=topic.standard,
         question=question,
         target_concept=target_concept,
         student_answer=student_answer,
     )
-    return _chat(system, "Evaluate the answer.")
+    return _chat(SYSTEM_QUIZ_EVALUATION, context, "Evaluate the answer.", temperature=0)
 
 
 def generate_session_summary(attempt) -> dict:
     """
     Generate an end-of-session summary for any mode.
     """
-    end_reason_map = {
-        "mastery": "Student reached mastery",
-        "max_turns": "Maximum turns reached",
-        "opted_out": "Student chose to stop",
-        "active": "Session still active",
-    }
-    system = SYSTEM_SUMMARY.format(
+    context = CONTEXT_SUMMARY.format(
         topic_name=attempt.topic.name,
         standard=attempt.topic.standard,
         mode=attempt.get_mode_display(),
         turn_count=attempt.turn_count,
-        end_reason=end_reason_map.get(attempt.status, attempt.status),
-        demonstrated=json.dumps(attempt.demonstrated_concepts),
-        missing=json.dumps(attempt.missing_concepts),
-        misconceptions=json.dumps(attempt.identified_misconceptions),
-        probed=json.dumps(attempt.probed_concepts),
+        end_reason=END_REASON_MAP.get(attempt.status, attempt.status),
+        demonstrated=_dumps(attempt.demonstrated_concepts),
+        missing=_dumps(attempt.missing_concepts),
+        misconceptions=_dumps(attempt.identified_misconceptions),
+        probed=_dumps(attempt.probed_concepts),
     )
-    return _chat(system, "Generate the session summary.")
+    return _chat(SYSTEM_SUMMARY, context, "Generate the session summary.")
 
 
 # ─── Mode 3: Transfer Challenge functions ─────────────────────────────────────
@@ -563,14 +936,9 @@ def generate_transfer_scenario(topic, transfer_level: int) -> dict:
     Returns dict with scenario_text, domain_context, target_concepts,
     expected_mappings, and surface_distractors.
     """
-    system = SYSTEM_TRANSFER_SCENARIO.format(
-        topic_name=topic.name,
-        standard=topic.standard,
-        expected_concepts=json.dumps(topic.expected_concepts),
-        level=transfer_level,
-    )
     return _chat(
-        system,
+        SYSTEM_TRANSFER_SCENARIO,
+        _transfer_scenario_context(topic, transfer_level),
         f"Generate a Level {transfer_level} transfer scenario for the topic: {topic.name}",
         max_tokens=2000,
     )
@@ -584,20 +952,21 @@ def diagnose_transfer(topic, scenario_data: dict, student_response: str,
     reasoning_chain, transfer_failure_type, transfer_failure_diagnosis,
     overall_feedback, and transfer_score.
     """
-    system = SYSTEM_TRANSFER_DIAGNOSIS.format(
+    context = CONTEXT_TRANSFER_DIAGNOSIS.format(
         topic_name=topic.name,
         standard=topic.standard,
-        expected_concepts=json.dumps(topic.expected_concepts),
+        expected_concepts=_topic_payload(topic).expected_concepts,
         scenario_text=scenario_data.get("scenario_text", ""),
         domain_context=scenario_data.get("domain_context", ""),
-        expected_mappings=json.dumps(scenario_data.get("expected_mappings", [])),
-        surface_distractors=json.dumps(scenario_data.get("surface_distractors", [])),
-        scaffolds_given=json.dumps(scaffolds_given or []),
+        expected_mappings=_dumps(scenario_data.get("expected_mappings", [])),
+        surface_distractors=_dumps(scenario_data.get("surface_distractors", [])),
+        scaffolds_given=_dumps(scaffolds_given or []),
         student_response=student_response,
     )
     return _chat(
-        system,
-        f"Diagnose this student's transfer attempt.",
+        SYSTEM_TRANSFER_DIAGNOSIS,
+        context,
+        "Diagnose this student's transfer attempt.",
         max_tokens=2000,
     )
 
@@ -610,14 +979,14 @@ def generate_transfer_scaffold(topic, scenario_data: dict, student_response: str
     Mode 3: generate a progressive scaffold hint for a struggling student.
     Returns dict with scaffold_type and scaffold_text.
     """
-    system = SYSTEM_TRANSFER_SCAFFOLD.format(
+    context = CONTEXT_TRANSFER_SCAFFOLD.format(
         topic_name=topic.name,
         standard=topic.standard,
         scenario_text=scenario_data.get("scenario_text", ""),
         student_response=student_response,
         failure_type=failure_type,
         failure_diagnosis=failure_diagnosis,
-        previous_scaffolds=json.dumps(previous_scaffolds or []),
+        previous_scaffolds=_dumps(previous_scaffolds or []),
         scaffold_number=scaffold_number,
     )
-    return _chat(system, "Generate a scaffold hint for this student.")
+    return _chat(SYSTEM_TRANSFER_SCAFFOLD, context, "Generate a scaffold hint for this student.")
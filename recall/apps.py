@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RecallConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recall'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects signal receivers)
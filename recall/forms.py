@@ -3,8 +3,24 @@ Django forms for the Adaptive Recall Engine.
 """
 
 from django import forms
+from django.core.cache import cache
 from .models import Topic
 
+# Largest notes PDF accepted by NotesUploadForm.
+MAX_UPLOAD_MB = 10
+
+# Cache entry holding the topic picker list, and how long it lives.
+TOPIC_CHOICES_CACHE_KEY = "topics:list"
+TOPIC_CHOICES_TIMEOUT = 300
+
+
+def validate_file_size(uploaded_file):
+    """Reject uploads over MAX_UPLOAD_MB before any PDF parsing happens."""
+    if uploaded_file.size > MAX_UPLOAD_MB * 1024 * 1024:
+        raise forms.ValidationError(
+            f"That file is too big. Please upload a PDF under {MAX_UPLOAD_MB} MB."
+        )
+
 
 class StudentNameForm(forms.Form):
     """Collect student name before starting a session."""
@@ -19,13 +35,40 @@ class StudentNameForm(forms.Form):
     )
 
 
+def topic_choices():
+    """
+    (pk, label) pairs for the topic picker.
+    Topics are seeded and rarely edited, so the list is kept in the Django
+    cache for TOPIC_CHOICES_TIMEOUT seconds. clear_topic_choices() (called
+    by the Topic signals in recall.signals and by seed_topics) only reaches
+    the process it runs in unless CACHES points at a shared backend, so
+    other workers may show the old list until the entry expires.
+    """
+    return cache.get_or_set(TOPIC_CHOICES_CACHE_KEY, _load_topic_choices, TOPIC_CHOICES_TIMEOUT)
+
+
+def _load_topic_choices():
+    return [
+        (t.pk, f"[{t.standard}] {t.name}")
+        for t in Topic.objects.only("pk", "standard", "name")
+    ]
+
+
+def clear_topic_choices():
+    cache.delete(TOPIC_CHOICES_CACHE_KEY)
+
+
+def _topic_select_choices():
+    return [("", "Choose a topic...")] + topic_choices()
+
+
 class TopicSelectForm(forms.Form):
     """Select a topic to study."""
 
-    topic = forms.ModelChoiceField(
-        queryset=Topic.objects.all(),
+    topic = forms.TypedChoiceField(
+        choices=_topic_select_choices,
+        coerce=int,
         widget=forms.Select(attrs={"class": "form-select"}),
-        empty_label="Choose a topic...",
     )
 
 
@@ -67,6 +110,7 @@ class NotesUploadForm(forms.Form):
         }),
         label="Upload Your Notes (PDF)",
         help_text="Upload a PDF of your class notes for this topic.",
+        validators=[validate_file_size],
     )
 
 
@@ -8,6 +8,8 @@ Usage:
 """
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from recall.forms import clear_topic_choices
 from recall.models import Topic, ConceptTag
 
 
@@ -283,39 +285,57 @@ class Command(BaseCommand):
             Topic.objects.all().delete()
             self.stdout.write(self.style.WARNING(f"Deleted {count} existing topics."))
 
-        created_count = 0
-        for data in TOPICS:
-            topic, created = Topic.objects.get_or_create(
-                name=data["name"],
-                standard=data["standard"],
-                defaults={
-                    "description": data["description"],
-                    "expected_concepts": data["expected_concepts"],
-                    "common_misconceptions": data["common_misconceptions"],
-                    "expected_reasoning_patterns": data.get("expected_reasoning_patterns", []),
-                    "supportive_followup_prompts": data.get("supportive_followup_prompts", []),
-                    "concise_explanations": data.get("concise_explanations", []),
-                },
-            )
-            if created:
-                created_count += 1
-                # Also create ConceptTag entries for each expected concept
-                for concept in data["expected_concepts"]:
-                    ConceptTag.objects.get_or_create(
-                        topic=topic,
-                        name=concept,
-                        defaults={"is_misconception": False},
-                    )
-                for misconception in data["common_misconceptions"]:
-                    ConceptTag.objects.get_or_create(
-                        topic=topic,
-                        name=misconception,
-                        defaults={"is_misconception": True},
-                    )
+        with transaction.atomic():
+            topics = {
+                (t.name, t.standard): t
+                for t in Topic.objects.only("pk", "name", "standard")
+            }
+            new_topics = []
+            for data in TOPICS:
+                if (data["name"], data["standard"]) in topics:
+                    self.stdout.write(f"  – Exists:  [{data['standard']}] {data['name']}")
+                    continue
+                topic = Topic(
+                    name=data["name"],
+                    standard=data["standard"],
+                    description=data["description"],
+                    expected_concepts=data["expected_concepts"],
+                    # bulk_create skips the pre_save signal that sets this
+                    concept_count=len(data["expected_concepts"]),
+                    common_misconceptions=data["common_misconceptions"],
+                    expected_reasoning_patterns=data.get("expected_reasoning_patterns", []),
+                    supportive_followup_prompts=data.get("supportive_followup_prompts", []),
+                    concise_explanations=data.get("concise_explanations", []),
+                )
+                topics[(topic.name, topic.standard)] = topic
+                new_topics.append(topic)
+
+            Topic.objects.bulk_create(new_topics)
+            for topic in new_topics:
                 self.stdout.write(f"  ✓ Created: [{topic.standard}] {topic.name}")
-            else:
-                self.stdout.write(f"  – Exists:  [{topic.standard}] {topic.name}")
+
+            # Create ConceptTag entries for each expected concept and misconception.
+            # Existing topics are included so concepts added to TOPICS later are
+            # picked up on a re-seed; one query finds the tags already present.
+            existing_tags = set(ConceptTag.objects.values_list("topic_id", "name"))
+            tags = []
+            for data in TOPICS:
+                topic = topics[(data["name"], data["standard"])]
+                wanted = [(concept, False) for concept in data["expected_concepts"]]
+                wanted += [(misconception, True) for misconception in data["common_misconceptions"]]
+                tags += [
+                    ConceptTag(topic=topic, name=name, is_misconception=is_misconception)
+                    for name, is_misconception in wanted
+                    if (topic.pk, name) not in existing_tags
+                ]
+            ConceptTag.objects.bulk_create(tags, batch_size=500)
+
+        # bulk_create doesn't send post_save, so clear the cached picker list here
+        clear_topic_choices()
 
         self.stdout.write(
-            self.style.SUCCESS(f"\nDone! {created_count} new topics created ({len(TOPICS)} total defined).")
+            self.style.SUCCESS(
+                f"\nDone! {len(new_topics)} new topics created ({len(TOPICS)} total defined), "
+                f"{len(tags)} concept tags added."
+            )
         )
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-14 19:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recall', '0003_topic_concise_explanations_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attempt',
+            name='probed_concepts',
+            field=models.JSONField(default=list, help_text='Concepts the student only demonstrated after a probing follow-up question (needed a nudge).'),
+        ),
+        migrations.AddField(
+            model_name='noteupload',
+            name='analysis_json',
+            field=models.JSONField(blank=True, default=dict, help_text='Concept analysis and generated quiz questions from the background task.'),
+        ),
+        migrations.AddField(
+            model_name='noteupload',
+            name='status',
+            field=models.CharField(choices=[('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', help_text="Set to 'processing' while the background task analyses the notes.", max_length=20),
+        ),
+    ]
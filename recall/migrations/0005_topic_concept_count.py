@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-14 19:15
+
+from django.db import migrations, models
+
+
+def backfill_concept_count(apps, schema_editor):
+    # Historical models don't run signals, so set the count here.
+    Topic = apps.get_model("recall", "Topic")
+    topics = list(Topic.objects.only("expected_concepts"))
+    for topic in topics:
+        topic.concept_count = len(topic.expected_concepts or [])
+    Topic.objects.bulk_update(topics, ["concept_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recall', '0004_attempt_probed_concepts_noteupload_analysis_json_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='concept_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='len(expected_concepts), kept in sync by a pre_save signal.'),
+        ),
+        migrations.RunPython(backfill_concept_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-14 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recall', '0005_topic_concept_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attempt',
+            name='ai_summary',
+            field=models.JSONField(blank=True, help_text='End-of-session summary, when it was generated together with the final turn.', null=True),
+        ),
+    ]
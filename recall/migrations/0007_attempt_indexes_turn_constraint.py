@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-14 19:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recall', '0006_attempt_ai_summary'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='turn',
+            options={'ordering': ['turn_number']},
+        ),
+        migrations.AddConstraint(
+            model_name='turn',
+            constraint=models.UniqueConstraint(fields=('attempt', 'turn_number'), name='unique_turn_number_per_attempt'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='turn',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='attempt',
+            index=models.Index(fields=['-created_at'], name='recall_atte_created_59c253_idx'),
+        ),
+    ]
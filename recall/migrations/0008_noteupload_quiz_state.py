@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-14 19:26
+
+from django.db import migrations, models
+
+
+def backfill_current_index(apps, schema_editor):
+    # Quizzes in progress kept their position in the session; each answered
+    # question is one turn, so resume them from turn_count.
+    NoteUpload = apps.get_model("recall", "NoteUpload")
+    uploads = list(
+        NoteUpload.objects.filter(status="ready").select_related("attempt").only("quiz_state", "attempt__turn_count")
+    )
+    for upload in uploads:
+        if "questions" in upload.quiz_state:
+            upload.quiz_state["current_index"] = upload.attempt.turn_count
+    NoteUpload.objects.bulk_update(uploads, ["quiz_state"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recall', '0007_attempt_indexes_turn_constraint'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='noteupload',
+            old_name='analysis_json',
+            new_name='quiz_state',
+        ),
+        migrations.AlterField(
+            model_name='noteupload',
+            name='quiz_state',
+            field=models.JSONField(blank=True, default=dict, help_text='Concept analysis, quiz questions and the current question index.'),
+        ),
+        migrations.RunPython(backfill_current_index, migrations.RunPython.noop),
+    ]
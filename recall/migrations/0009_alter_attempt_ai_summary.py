@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-14 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recall', '0008_noteupload_quiz_state'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attempt',
+            name='ai_summary',
+            field=models.JSONField(blank=True, help_text='End-of-session summary, saved with the final turn or when the summary page first generates it.', null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-14 20:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recall', '0009_alter_attempt_ai_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Last change; keys the per-topic prompt caches in ai_service.'),
+            preserve_default=False,
+        ),
+    ]
@@ -34,6 +34,11 @@ class Topic(models.Model):
         default=list,
         help_text="List of concept strings students should know for this topic.",
     )
+    concept_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="len(expected_concepts), kept in sync by a pre_save signal.",
+    )
     common_misconceptions = models.JSONField(
         default=list,
         help_text="List of known misconceptions for this topic.",
@@ -61,6 +66,10 @@ class Topic(models.Model):
         blank=True,
         help_text="Caption describing the visual support image.",
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last change; keys the per-topic prompt caches in ai_service.",
+    )
 
     class Meta:
         ordering = ["standard", "name"]
@@ -145,9 +154,18 @@ class Attempt(models.Model):
         default=list,
         help_text="Concepts the student only demonstrated after a probing follow-up question (needed a nudge).",
     )
+    ai_summary = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="End-of-session summary, saved with the final turn or when the summary page first generates it.",
+    )
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Recent-sessions list on the dashboard
+            models.Index(fields=["-created_at"]),
+        ]
 
     def __str__(self):
         return f"Attempt #{self.pk} – {self.student_name} – {self.topic.name} ({self.get_mode_display()})"
@@ -172,17 +190,16 @@ class Attempt(models.Model):
         )
         return missing_ok and misconceptions_ok and followups_ok
 
-    def check_end_condition(self):
+    def evaluate_end_condition(self):
         """
-        Evaluate stop rules and update status accordingly.
-        Returns the new status string.
+        Evaluate stop rules and return the status the attempt should have.
+        Doesn't modify or save the attempt; the caller does that.
         """
         if self.mastery_met:
-            self.status = "mastery"
-        elif self.turn_count >= self.max_turns:
-            self.status = "max_turns"
+            return "mastery"
+        if self.turn_count >= self.max_turns:
+            return "max_turns"
         # 'opted_out' is set explicitly by the view
-        self.save()
         return self.status
 
 
@@ -217,8 +234,15 @@ class Turn(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ["attempt", "turn_number"]
-        unique_together = ["attempt", "turn_number"]
+        # Turns are always read through one attempt, so ordering by
+        # turn_number alone avoids a sort on the attempt column.
+        ordering = ["turn_number"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["attempt", "turn_number"],
+                name="unique_turn_number_per_attempt",
+            ),
+        ]
 
     def __str__(self):
         return f"Turn {self.turn_number} of Attempt #{self.attempt_id}"
@@ -230,6 +254,12 @@ class Turn(models.Model):
 class NoteUpload(models.Model):
     """A PDF of class notes uploaded by a student for Mode 2."""
 
+    STATUS_CHOICES = [
+        ("processing", "Processing"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+
     attempt = models.OneToOneField(
         Attempt,
         on_delete=models.CASCADE,
@@ -244,6 +274,17 @@ class NoteUpload(models.Model):
         default=list,
         help_text="Concepts extracted from the notes by AI.",
     )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="ready",
+        help_text="Set to 'processing' while the background task analyses the notes.",
+    )
+    quiz_state = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Concept analysis, quiz questions and the current question index.",
+    )
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
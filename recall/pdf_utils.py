@@ -0,0 +1,105 @@
+"""
+PDF helpers for Mode 2 notes uploads.
+
+Text is extracted with pypdfium2 (PDFium's C++ parser). Files PDFium can't
+open are retried with PyPDF2 when it is installed. Extracted text is
+normalised so the AI prompt sees plain words rather than PDF typography.
+"""
+
+import logging
+import re
+import unicodedata
+
+import pypdfium2 as pdfium
+
+logger = logging.getLogger(__name__)
+
+# Only the start of the notes reaches the AI prompt, so stop reading pages
+# once this much text has been collected instead of parsing the whole PDF.
+MAX_NOTES_CHARS = 6000
+
+# A word hyphenated across a line break, e.g. "photo-\nsynthesis".
+_LINE_BREAK_HYPHEN = re.compile(r"-\n(?=\w)")
+
+# Characters NFKC leaves alone: old Mac line endings, soft hyphens, and
+# zero-width spaces / BOMs that some PDF generators put between letters.
+_CLEANUP_TABLE = str.maketrans({
+    "\r": "\n",
+    "\u00ad": None,
+    "\u200b": None,
+    "\ufeff": None,
+})
+
+
+def normalize_text(text):
+    """
+    Clean up extracted PDF text: NFKC folds ligatures ("ﬁ" → "fi") and
+    non-breaking spaces, soft hyphens and zero-width characters are
+    dropped, line endings become "\\n", and words hyphenated across a line
+    break are joined.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\r\n", "\n").translate(_CLEANUP_TABLE)
+    return _LINE_BREAK_HYPHEN.sub("", text)
+
+
+def _pdfium_pages(pdf_file):
+    pdf = pdfium.PdfDocument(pdf_file)
+    try:
+        for page in pdf:
+            textpage = page.get_textpage()
+            page_text = textpage.get_text_range()
+            textpage.close()
+            page.close()
+            yield page_text
+    finally:
+        pdf.close()
+
+
+def _pypdf2_pages(pdf_file):
+    from PyPDF2 import PdfReader
+
+    for page in PdfReader(pdf_file).pages:
+        yield page.extract_text() or ""
+
+
+def _collect(pages, max_chars):
+    """Join normalised page texts, stopping once max_chars is reached."""
+    parts = []
+    length = 0
+    for page_text in pages:
+        page_text = normalize_text(page_text)
+        if page_text:
+            parts.append(page_text)
+            length += len(page_text) + 1
+        if length >= max_chars:
+            pages.close()
+            break
+    return "\n".join(parts)[:max_chars]
+
+
+def _has_pypdf2():
+    try:
+        import PyPDF2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def extract_text(pdf_file, max_chars=MAX_NOTES_CHARS):
+    """
+    Return the text of ``pdf_file`` page by page, stopping at ``max_chars``.
+
+    ``pdf_file`` may be a path, bytes, or a seekable binary file such as an
+    uploaded file. Raises if neither PDFium nor PyPDF2 can read it.
+    """
+    try:
+        return _collect(_pdfium_pages(pdf_file), max_chars)
+    except pdfium.PdfiumError as e:
+        if not _has_pypdf2():
+            raise
+        logger.warning("PDFium could not read PDF (%s), retrying with PyPDF2", e)
+
+    if hasattr(pdf_file, "seek"):
+        pdf_file.seek(0)
+    return _collect(_pypdf2_pages(pdf_file), max_chars)
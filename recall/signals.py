@@ -0,0 +1,27 @@
+"""
+Signal handlers for the recall app.
+
+Topics change rarely (seeding or teacher edits in the admin), so derived
+data is cached and invalidated here whenever a Topic changes.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .forms import clear_topic_choices
+from .models import Topic
+from . import ai_service
+
+
+@receiver(pre_save, sender=Topic)
+def set_concept_count(sender, instance, **kwargs):
+    """Store the expected concept count so list views don't load the JSON."""
+    instance.concept_count = len(instance.expected_concepts or [])
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def clear_topic_caches(sender, **kwargs):
+    """Drop cached prompt payloads and the topic picker list."""
+    ai_service.clear_topic_cache()
+    clear_topic_choices()
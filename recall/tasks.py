@@ -0,0 +1,169 @@
+"""
+Background tasks for the recall app.
+
+Processing uploaded notes means parsing the PDF and an OpenAI call that
+analyses the notes and writes the quiz, which can hold a request for
+5–15s. Views hand that work to enqueue() and return straight away; the
+browser polls a status endpoint until the task marks the upload ready.
+
+Tasks run on a daemon thread in the web process. To move them to a real
+worker queue (Celery, RQ, Django-Q), only enqueue() needs to change.
+A thread dies with its worker, so uploads still processing after
+NOTES_PROCESSING_TIMEOUT are treated as failed by expire_stale_upload().
+"""
+
+import hashlib
+import logging
+import threading
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from .models import NoteUpload
+from .pdf_utils import extract_text
+from . import ai_service
+
+logger = logging.getLogger(__name__)
+
+# How long the "done" flag for a notes upload stays in the cache.
+NOTES_DONE_TIMEOUT = 3600
+
+# How long AI results for a given topic version + notes text are reused, so
+# re-uploading the same PDF doesn't call OpenAI again.
+NOTES_AI_CACHE_TIMEOUT = 86400
+
+# Longest a notes upload may stay "processing". Well past the slowest
+# successful run (PDF parsing plus an OpenAI call with its retries).
+NOTES_PROCESSING_TIMEOUT = timedelta(minutes=10)
+
+
+def notes_done_key(note_upload_id):
+    return f"notes:{note_upload_id}:done"
+
+
+def _cached_ai_call(key, call):
+    """Return the cached result for key, or call() and cache it unless it failed."""
+    result = cache.get(key)
+    if result is None:
+        result = call()
+        if "error" not in result:
+            cache.set(key, result, NOTES_AI_CACHE_TIMEOUT)
+    return result
+
+
+def enqueue(task, *args):
+    """Run ``task(*args)`` in the background."""
+    thread = threading.Thread(target=_run, args=(task, *args), daemon=True)
+    thread.start()
+
+
+def _run(task, *args):
+    try:
+        task(*args)
+    except Exception:
+        logger.exception("Background task %s failed", task.__name__)
+    finally:
+        # The thread opened its own DB connection; close it unconditionally,
+        # since close_old_connections() keeps it open under CONN_MAX_AGE.
+        connection.close()
+
+
+def _fail_notes_upload(note_upload, message):
+    note_upload.status = "failed"
+    note_upload.quiz_state = {"error": message}
+    note_upload.save(update_fields=["status", "quiz_state"])
+
+
+def expire_stale_upload(note_upload):
+    """
+    Mark a "processing" upload failed once it is older than
+    NOTES_PROCESSING_TIMEOUT, e.g. because the worker running its task was
+    restarted. Returns True if the upload was expired.
+    """
+    if note_upload.status != "processing":
+        return False
+    if timezone.now() - note_upload.uploaded_at < NOTES_PROCESSING_TIMEOUT:
+        return False
+    logger.warning("Notes upload %s timed out while processing", note_upload.pk)
+    _fail_notes_upload(note_upload, "Reading your notes took too long. Please try again.")
+    return True
+
+
+def _extract_notes_text(note_upload):
+    """Extract the stored PDF's text, opening it by path when the storage has one."""
+    try:
+        path = note_upload.file.path
+    except NotImplementedError:
+        # Remote storage (e.g. S3) has no local path; read through the file object
+        with note_upload.file.open("rb") as pdf_file:
+            return extract_text(pdf_file)
+    # PDFium reads a path directly instead of pulling the file through Python
+    return extract_text(path)
+
+
+def process_notes_upload(note_upload_id):
+    """Extract text and concepts from an uploaded PDF, build its quiz, mark it ready."""
+    note_upload = NoteUpload.objects.select_related("attempt__topic").get(pk=note_upload_id)
+    attempt = note_upload.attempt
+    topic = attempt.topic
+
+    # Extract text from the saved PDF (only as much as the AI prompt will use)
+    try:
+        extracted_text = _extract_notes_text(note_upload)
+    except Exception as e:
+        logger.error("PDF extraction error: %s", e)
+        _fail_notes_upload(note_upload, "Could not read this PDF. Please try a different file.")
+        return
+
+    if not extracted_text.strip():
+        _fail_notes_upload(note_upload, "No text found in this PDF. Please upload a text-based PDF (not a scanned image).")
+        return
+    note_upload.extracted_text = extracted_text
+    # updated_at is part of the key so an edited rubric doesn't reuse old results
+    text_hash = hashlib.sha256(extracted_text.encode()).hexdigest()
+    cache_key = f"notes:{topic.pk}:{topic.updated_at.timestamp()}:{text_hash}"
+
+    try:
+        result = _cached_ai_call(
+            f"{cache_key}:notes_quiz",
+            lambda: ai_service.extract_and_quiz(topic, extracted_text),
+        )
+    except Exception:
+        _fail_notes_upload(note_upload, "Something went wrong building your quiz. Please try again.")
+        raise
+
+    if "error" in result:
+        covered = []
+        missing = topic.expected_concepts
+        misconceptions = []
+        questions = []
+    else:
+        covered = result.get("covered_concepts", [])
+        missing = result.get("missing_concepts", [])
+        misconceptions = result.get("misconceptions", [])
+        questions = result.get("questions", [])
+
+    if not questions:
+        questions = [{"question": f"Explain what you know about {topic.name}.", "target_concept": topic.name, "hint": "Think about the main ideas."}]
+
+    attempt.demonstrated_concepts = covered
+    attempt.missing_concepts = missing
+    attempt.identified_misconceptions = [m.get("claim", str(m)) for m in misconceptions]
+    attempt.save(update_fields=[
+        "demonstrated_concepts", "missing_concepts", "identified_misconceptions", "updated_at",
+    ])
+
+    note_upload.extracted_concepts = covered
+    note_upload.quiz_state = {
+        "questions": questions,
+        "covered_concepts": covered,
+        "missing_concepts": missing,
+        "misconceptions": misconceptions,
+        "current_index": 0,
+    }
+    note_upload.status = "ready"
+    note_upload.save(update_fields=["extracted_text", "extracted_concepts", "quiz_state", "status"])
+
+    cache.set(notes_done_key(note_upload.pk), True, NOTES_DONE_TIMEOUT)
@@ -1,3 +1,286 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import ai_service, tasks
+from .forms import topic_choices
+from .models import Attempt, NoteUpload, Topic, Turn
+
+
+def make_topic(**fields):
+    defaults = {
+        "name": "Cells & Organelles",
+        "standard": "S7L2",
+        "expected_concepts": ["Ribosomes make proteins", "Nucleus contains DNA"],
+    }
+    defaults.update(fields)
+    return Topic.objects.create(**defaults)
+
+
+class FakeStream:
+    """Stands in for an OpenAI chat completion stream."""
+
+    def __init__(self, deltas, finish_reason="stop"):
+        self.deltas = deltas
+        self.finish_reason = finish_reason
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for i, delta in enumerate(self.deltas):
+            self.consumed += 1
+            last = i == len(self.deltas) - 1
+            choice = SimpleNamespace(
+                delta=SimpleNamespace(content=delta),
+                finish_reason=self.finish_reason if last else None,
+            )
+            yield SimpleNamespace(choices=[choice])
+
+    def close(self):
+        self.closed = True
+
+
+def fake_client(stream):
+    create = mock.Mock(return_value=stream)
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+class PromptContextCacheTests(TestCase):
+    def setUp(self):
+        ai_service.clear_topic_cache()
+        self.topic = make_topic()
+
+    def test_saving_topic_refreshes_prompt_context(self):
+        self.assertIn("Ribosomes make proteins", ai_service._brain_dump_context(self.topic))
+        self.topic.expected_concepts = ["Mitochondria produce ATP"]
+        self.topic.save()
+        context = ai_service._brain_dump_context(Topic.objects.get(pk=self.topic.pk))
+        self.assertIn("Mitochondria produce ATP", context)
+        self.assertNotIn("Ribosomes make proteins", context)
+
+    def test_update_elsewhere_refreshes_prompt_context(self):
+        # QuerySet.update() sends no signal, as with an edit in another process
+        ai_service._brain_dump_context(self.topic)
+        Topic.objects.filter(pk=self.topic.pk).update(
+            expected_concepts=["Mitochondria produce ATP"], updated_at=timezone.now(),
+        )
+        context = ai_service._brain_dump_context(Topic.objects.get(pk=self.topic.pk))
+        self.assertIn("Mitochondria produce ATP", context)
+
+
+class JsonStreamTests(TestCase):
+    def test_object_end_ignores_braces_in_strings(self):
+        state = [0, False, False]
+        text = '{"claim": "a } and \\" {", "n": {"x": 1}} trailing'
+        end = ai_service._json_object_end(text, state)
+        self.assertEqual(text[:end], '{"claim": "a } and \\" {", "n": {"x": 1}}')
+
+    def test_object_end_carries_state_between_chunks(self):
+        state = [0, False, False]
+        self.assertEqual(ai_service._json_object_end('{"a": "}', state), -1)
+        self.assertEqual(ai_service._json_object_end('"}', state), 2)
+
+    def test_stream_stops_at_closing_brace(self):
+        stream = FakeStream(['{"a": ', '"x"}', "never read", "{}"])
+        with mock.patch.object(ai_service, "_get_client", return_value=fake_client(stream)):
+            text, finish_reason = ai_service._stream_json("system", "context", "user")
+
+        self.assertEqual(text, '{"a": "x"}')
+        self.assertIsNone(finish_reason)
+        self.assertEqual(stream.consumed, 2)
+        self.assertTrue(stream.closed)
+
+    def test_truncated_stream_reports_finish_reason(self):
+        stream = FakeStream(['{"a": ', '"x'], finish_reason="length")
+        with mock.patch.object(ai_service, "_get_client", return_value=fake_client(stream)):
+            with self.assertLogs("recall.ai_service", "ERROR") as logs:
+                result = ai_service._chat("system", "context", "user")
+
+        self.assertIn("error", result)
+        self.assertIn("finish reason: length", logs.output[0])
+
+
+class BrainDumpSubmitTests(TestCase):
+    def setUp(self):
+        self.topic = make_topic()
+        self.attempt = Attempt.objects.create(
+            topic=self.topic, mode="brain_dump", missing_concepts=self.topic.expected_concepts,
+        )
+        self.url = reverse("recall:brain_dump_submit", args=[self.attempt.pk])
+        self.feedback = {
+            "demonstrated_concepts": ["Nucleus contains DNA"],
+            "missing_concepts": ["Ribosomes make proteins"],
+            "misconceptions": [],
+            "overall_feedback": "Nice start!",
+            "follow_up_question": "What makes proteins?",
+            "is_correct": None,
+        }
+
+    def test_saves_turn_and_attempt(self):
+        with mock.patch.object(ai_service, "analyze_brain_dump", return_value=self.feedback):
+            response = self.client.post(self.url, {"response": "The nucleus holds DNA."})
+
+        self.assertRedirects(response, reverse("recall:brain_dump", args=[self.attempt.pk]))
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.turn_count, 1)
+        self.assertEqual(self.attempt.demonstrated_concepts, ["Nucleus contains DNA"])
+        turn = self.attempt.turns.get()
+        self.assertEqual(turn.turn_number, 1)
+        self.assertEqual(turn.ai_feedback, self.feedback)
+
+    def test_failed_attempt_save_rolls_back_turn(self):
+        with mock.patch.object(ai_service, "analyze_brain_dump", return_value=self.feedback), \
+                mock.patch.object(Attempt, "save", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.post(self.url, {"response": "The nucleus holds DNA."})
+
+        self.assertFalse(Turn.objects.exists())
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.turn_count, 0)
+
+
+class NotesTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.topic = make_topic()
+        self.attempt = Attempt.objects.create(
+            topic=self.topic, mode="notes_quiz", missing_concepts=self.topic.expected_concepts,
+        )
+
+    def make_upload(self, **fields):
+        return NoteUpload.objects.create(attempt=self.attempt, file="notes/notes.pdf", **fields)
+
+
+class ProcessNotesUploadTests(NotesTestMixin, TestCase):
+    def test_success_marks_upload_ready(self):
+        upload = self.make_upload(status="processing")
+        result = {
+            "covered_concepts": ["Nucleus contains DNA"],
+            "missing_concepts": ["Ribosomes make proteins"],
+            "misconceptions": [{"claim": "Cells are flat", "correction": "They are 3D"}],
+            "questions": [{"question": "What makes proteins?", "target_concept": "Ribosomes make proteins"}],
+        }
+        with mock.patch.object(tasks, "_extract_notes_text", return_value="The nucleus holds DNA."), \
+                mock.patch.object(ai_service, "extract_and_quiz", return_value=result):
+            tasks.process_notes_upload(upload.pk)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, "ready")
+        self.assertEqual(upload.extracted_text, "The nucleus holds DNA.")
+        self.assertEqual(upload.quiz_state["questions"], result["questions"])
+        self.assertEqual(upload.quiz_state["current_index"], 0)
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.missing_concepts, ["Ribosomes make proteins"])
+        self.assertEqual(self.attempt.identified_misconceptions, ["Cells are flat"])
+        self.assertTrue(cache.get(tasks.notes_done_key(upload.pk)))
+
+    def test_topic_edit_misses_cached_result(self):
+        upload = self.make_upload(status="processing")
+        result = {"covered_concepts": [], "missing_concepts": [], "misconceptions": [], "questions": []}
+        with mock.patch.object(tasks, "_extract_notes_text", return_value="The nucleus holds DNA."), \
+                mock.patch.object(ai_service, "extract_and_quiz", return_value=result) as extract_and_quiz:
+            tasks.process_notes_upload(upload.pk)
+            tasks.process_notes_upload(upload.pk)
+            self.assertEqual(extract_and_quiz.call_count, 1)
+
+            Topic.objects.filter(pk=self.topic.pk).update(
+                updated_at=timezone.now() + timedelta(seconds=1)
+            )
+            tasks.process_notes_upload(upload.pk)
+            self.assertEqual(extract_and_quiz.call_count, 2)
+
+    def test_unreadable_pdf_marks_upload_failed(self):
+        upload = self.make_upload(status="processing")
+        with mock.patch.object(tasks, "_extract_notes_text", side_effect=ValueError("bad pdf")), \
+                mock.patch.object(ai_service, "extract_and_quiz") as extract_and_quiz:
+            tasks.process_notes_upload(upload.pk)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, "failed")
+        self.assertIn("Could not read this PDF", upload.quiz_state["error"])
+        extract_and_quiz.assert_not_called()
+
+    def test_pdf_without_text_marks_upload_failed(self):
+        upload = self.make_upload(status="processing")
+        with mock.patch.object(tasks, "_extract_notes_text", return_value="  \n "):
+            tasks.process_notes_upload(upload.pk)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, "failed")
+        self.assertIn("No text found", upload.quiz_state["error"])
+
+
+class NotesStatusGatingTests(NotesTestMixin, TestCase):
+    def status(self, upload):
+        return self.client.get(reverse("recall:notes_status", args=[upload.pk])).json()
+
+    def quiz(self):
+        return self.client.get(reverse("recall:quiz", args=[self.attempt.pk]))
+
+    def test_processing_upload_keeps_polling(self):
+        upload = self.make_upload(status="processing")
+        self.assertEqual(self.status(upload), {"status": "processing"})
+        self.assertEqual(self.quiz().status_code, 202)
+
+    def test_failed_upload_returns_to_upload_form(self):
+        upload = self.make_upload(status="failed", quiz_state={"error": "No text found"})
+        self.assertEqual(self.status(upload), {"status": "failed", "error": "No text found"})
+        self.assertRedirects(self.quiz(), reverse("recall:notes_upload", args=[self.attempt.pk]))
+
+    def test_ready_upload_shows_question(self):
+        self.make_upload(status="ready", quiz_state={
+            "questions": [{"question": "What makes proteins?", "target_concept": "Ribosomes make proteins"}],
+            "current_index": 0,
+        })
+        response = self.quiz()
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "What makes proteins?")
+
+    def test_stale_processing_upload_expires(self):
+        upload = self.make_upload(status="processing")
+        NoteUpload.objects.filter(pk=upload.pk).update(
+            uploaded_at=timezone.now() - tasks.NOTES_PROCESSING_TIMEOUT - timedelta(minutes=1)
+        )
+        self.assertEqual(self.status(upload)["status"], "failed")
+        self.assertRedirects(self.quiz(), reverse("recall:notes_upload", args=[self.attempt.pk]))
+
+    def test_upload_without_quiz_can_be_replaced(self):
+        # Uploads from before quiz_state held the quiz are "ready" with no questions
+        upload = self.make_upload()
+        upload_url = reverse("recall:notes_upload", args=[self.attempt.pk])
+        self.assertRedirects(self.quiz(), upload_url, fetch_redirect_response=False)
+        response = self.client.post(
+            reverse("recall:quiz_submit", args=[self.attempt.pk]), {"answer": "Ribosomes"}
+        )
+        self.assertRedirects(response, upload_url, fetch_redirect_response=False)
+
+        self.assertEqual(self.client.get(upload_url).status_code, 200)
+        self.assertFalse(NoteUpload.objects.filter(pk=upload.pk).exists())
+
+
+class TopicChoicesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.topic = make_topic()
+
+    def test_saving_topic_clears_topic_choices(self):
+        self.assertEqual(topic_choices(), [(self.topic.pk, "[S7L2] Cells & Organelles")])
+        self.topic.name = "Cell Structures"
+        self.topic.save()
+        self.assertEqual(topic_choices(), [(self.topic.pk, "[S7L2] Cell Structures")])
+
+    def test_deleting_topic_clears_topic_choices(self):
+        self.assertEqual(len(topic_choices()), 1)
+        self.topic.delete()
+        self.assertEqual(topic_choices(), [])
 
-# Create your tests here.
+    def test_topic_choices_served_from_cache(self):
+        topic_choices()
+        with self.assertNumQueries(0):
+            self.assertEqual(topic_choices(), [(self.topic.pk, "[S7L2] Cells & Organelles")])
@@ -17,6 +17,7 @@ urlpatterns = [
     # Mode 2: Notes Upload & Quiz
     path("notes/<int:attempt_id>/", views.notes_upload, name="notes_upload"),
     path("notes/<int:attempt_id>/submit/", views.notes_upload_submit, name="notes_upload_submit"),
+    path("notes/status/<int:note_upload_id>/", views.notes_status, name="notes_status"),
     path("quiz/<int:attempt_id>/", views.quiz, name="quiz"),
     path("quiz/<int:attempt_id>/submit/", views.quiz_submit, name="quiz_submit"),
 
@@ -13,7 +13,8 @@ Mode 1 (Active Recall Reflection):
 
 Mode 2 (Notes Upload & Low-Stakes Quiz):
   1. Student picks a topic, uploads PDF notes.
-  2. AI extracts concepts, generates conceptual questions.
+  2. AI extracts concepts, generates conceptual questions (background task,
+     the browser polls until the quiz is ready).
   3. Student answers each question → immediate feedback.
   4. Ends after all questions answered → summary page.
 
@@ -26,8 +27,11 @@ Mode 3 (Transfer Challenge):
 
 import json
 import logging
-from PyPDF2 import PdfReader
+from types import MappingProxyType
 
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
@@ -39,22 +43,36 @@ from .models import (
 from .forms import (
     StudentNameForm,
     TopicSelectForm,
+    topic_choices,
     BrainDumpForm,
     FollowUpForm,
     NotesUploadForm,
     QuizAnswerForm,
 )
-from . import ai_service
+from . import ai_service, tasks
 
 logger = logging.getLogger(__name__)
 
 
+def _get_attempt(attempt_id, turns=True, related=(), **filters):
+    """
+    Fetch an attempt with its topic (and any ``related`` relations), or 404.
+    With turns=True its turns are prefetched in turn order, so
+    attempt.turns.all() needs no further query.
+    """
+    queryset = Attempt.objects.select_related("topic", *related)
+    if turns:
+        queryset = queryset.prefetch_related(
+            Prefetch("turns", queryset=Turn.objects.order_by("turn_number"))
+        )
+    return get_object_or_404(queryset, pk=attempt_id, **filters)
+
+
 # ─── Home & Setup ─────────────────────────────────────────────────────────────
 
 def home(request):
     """Landing page with mode selection."""
-    topics = Topic.objects.all()
-    return render(request, "recall/home.html", {"topics": topics})
+    return render(request, "recall/home.html", {"topic_choices": topic_choices()})
 
 
 def start_session(request):
@@ -89,18 +107,56 @@ def start_session(request):
 
 # ─── Mode 1: Brain Dump ──────────────────────────────────────────────────────
 
+HISTORY_RECENT_TURNS = 4  # Turns sent verbatim to the follow-up prompt
+HISTORY_EARLIER_CHARS = 200  # Per-answer excerpt for older turns
+HISTORY_MAX_CHARS = 8000  # Hard cap, roughly 2000 tokens
+
+
+# Turn columns read by _build_conversation_history, in tuple order.
+HISTORY_FIELDS = ("turn_number", "prompt", "student_response", "ai_feedback")
+
+
+def _build_conversation_history(turns):
+    """
+    Format previous turns for analyze_followup, keeping the prompt bounded.
+    ``turns`` are HISTORY_FIELDS tuples from values_list(), oldest first.
+    The most recent turns are included in full; older ones are condensed
+    to one line each, and the result is trimmed from the oldest end.
+    """
+    earlier = turns[:-HISTORY_RECENT_TURNS]
+    recent = turns[-HISTORY_RECENT_TURNS:]
+
+    history_parts = []
+    for turn_number, prompt, answer, _ in earlier:
+        if len(answer) > HISTORY_EARLIER_CHARS:
+            answer = answer[:HISTORY_EARLIER_CHARS] + "…"
+        history_parts.append(f"Round {turn_number} (earlier) — Q: {prompt} / A: {answer}")
+    for _, prompt, answer, ai_feedback in recent:
+        history_parts.append(f"Q: {prompt}")
+        history_parts.append(f"A: {answer}")
+        if ai_feedback.get("overall_feedback"):
+            history_parts.append(f"Feedback: {ai_feedback['overall_feedback']}")
+
+    conversation_history = "\n".join(history_parts)
+    if len(conversation_history) > HISTORY_MAX_CHARS:
+        conversation_history = "…" + conversation_history[-HISTORY_MAX_CHARS:]
+    return conversation_history
+
+
 def brain_dump(request, attempt_id):
     """Show the brain dump textarea (turn 1) or the follow-up loop (turn 2+)."""
-    attempt = get_object_or_404(Attempt, pk=attempt_id, mode="brain_dump")
+    attempt = _get_attempt(attempt_id, turns=False, mode="brain_dump")
 
     if attempt.status != "active":
         return redirect("recall:summary", attempt_id=attempt.pk)
 
-    turns = attempt.turns.all()
-    form = BrainDumpForm() if not turns.exists() else FollowUpForm()
+    # turn_count is stored on the attempt, so the first render needs no turns query
+    is_first_turn = attempt.turn_count == 0
+    turns = [] if is_first_turn else list(attempt.turns.order_by("turn_number"))
+    form = BrainDumpForm() if is_first_turn else FollowUpForm()
 
     # Get the last turn's follow-up question if it exists
-    last_turn = turns.last()
+    last_turn = turns[-1] if turns else None
     follow_up_question = None
     last_feedback = None
     if last_turn and last_turn.ai_feedback:
@@ -113,7 +169,7 @@ def brain_dump(request, attempt_id):
         "form": form,
         "follow_up_question": follow_up_question,
         "last_feedback": last_feedback,
-        "is_first_turn": not turns.exists(),
+        "is_first_turn": is_first_turn,
     }
     return render(request, "recall/brain_dump.html", context)
 
@@ -121,7 +177,7 @@ def brain_dump(request, attempt_id):
 @require_POST
 def brain_dump_submit(request, attempt_id):
     """Process a brain dump or follow-up response."""
-    attempt = get_object_or_404(Attempt, pk=attempt_id, mode="brain_dump")
+    attempt = _get_attempt(attempt_id, turns=False, mode="brain_dump")
 
     if attempt.status != "active":
         return redirect("recall:summary", attempt_id=attempt.pk)
@@ -131,8 +187,7 @@ def brain_dump_submit(request, attempt_id):
         return redirect("recall:brain_dump", attempt_id=attempt.pk)
 
     topic = attempt.topic
-    turns = attempt.turns.all()
-    turn_number = turns.count() + 1
+    turn_number = attempt.turn_count + 1
 
     if turn_number == 1:
         # First turn: analyse the brain dump
@@ -140,17 +195,18 @@ def brain_dump_submit(request, attempt_id):
         feedback = ai_service.analyze_brain_dump(topic, student_response)
     else:
         # Follow-up turns: build conversation history
-        history_parts = []
-        for t in turns:
-            history_parts.append(f"Prompt: {t.prompt}")
-            history_parts.append(f"Student: {t.student_response}")
-            if t.ai_feedback.get("overall_feedback"):
-                history_parts.append(f"Feedback: {t.ai_feedback['overall_feedback']}")
-        conversation_history = "\n".join(history_parts)
-
-        last_turn = turns.last()
-        prompt_text = last_turn.ai_feedback.get("follow_up_question", "Follow-up question")
-        feedback = ai_service.analyze_followup(topic, conversation_history, student_response)
+        turns = list(attempt.turns.order_by("turn_number").values_list(*HISTORY_FIELDS))
+        conversation_history = _build_conversation_history(turns)
+
+        last_feedback = turns[-1][-1]
+        prompt_text = last_feedback.get("follow_up_question", "Follow-up question")
+        # On the final turn, get the session summary from the same call
+        is_likely_last_turn = attempt.turn_count >= attempt.max_turns - 1
+        feedback, session_summary = ai_service.analyze_followup_maybe_summary(
+            attempt, conversation_history, student_response, is_likely_last_turn
+        )
+        if session_summary and "error" not in feedback:
+            attempt.ai_summary = session_summary
 
     # Handle AI errors gracefully
     if "error" in feedback:
@@ -164,18 +220,8 @@ def brain_dump_submit(request, attempt_id):
             "is_correct": None,
         }
 
-    # Create the turn record
-    is_correct = feedback.get("is_correct")
-    turn = Turn.objects.create(
-        attempt=attempt,
-        turn_number=turn_number,
-        prompt=prompt_text,
-        student_response=student_response,
-        ai_feedback=feedback,
-        is_correct=is_correct,
-    )
-
     # Update attempt state
+    is_correct = feedback.get("is_correct")
     attempt.demonstrated_concepts = feedback.get("demonstrated_concepts", [])
     attempt.missing_concepts = feedback.get("missing_concepts", [])
     attempt.identified_misconceptions = [
@@ -195,7 +241,23 @@ def brain_dump_submit(request, attempt_id):
         attempt.probed_concepts = existing_probed
 
     # Check end conditions
-    attempt.check_end_condition()
+    attempt.status = attempt.evaluate_end_condition()
+
+    # Record the turn and the attempt update together
+    with transaction.atomic():
+        Turn.objects.create(
+            attempt=attempt,
+            turn_number=turn_number,
+            prompt=prompt_text,
+            student_response=student_response,
+            ai_feedback=feedback,
+            is_correct=is_correct,
+        )
+        attempt.save(update_fields=[
+            "demonstrated_concepts", "missing_concepts", "identified_misconceptions",
+            "turn_count", "correct_followups", "probed_concepts", "ai_summary",
+            "status", "updated_at",
+        ])
 
     if attempt.status != "active":
         return redirect("recall:summary", attempt_id=attempt.pk)
@@ -209,129 +271,111 @@ def notes_upload(request, attempt_id):
     """Show the PDF upload form for Mode 2."""
     attempt = get_object_or_404(Attempt, pk=attempt_id, mode="notes_quiz")
 
-    if hasattr(attempt, "note_upload"):
-        return redirect("recall:quiz", attempt_id=attempt.pk)
+    upload_error = None
+    note_upload = getattr(attempt, "note_upload", None)
+    if note_upload is not None:
+        if note_upload.status == "processing" or note_upload.quiz_state.get("questions"):
+            return redirect("recall:quiz", attempt_id=attempt.pk)
+        # Processing failed (or an older upload has no quiz) — show why and
+        # clear it so the student can try again
+        upload_error = note_upload.quiz_state.get(
+            "error", "Something went wrong reading your notes. Please try again."
+        )
+        note_upload.file.delete(save=False)
+        note_upload.delete()
 
     form = NotesUploadForm()
     return render(request, "recall/notes_upload.html", {
         "attempt": attempt,
         "form": form,
+        "upload_error": upload_error,
     })
 
 
 @require_POST
 def notes_upload_submit(request, attempt_id):
-    """Process uploaded PDF, extract text, analyse concepts, generate quiz."""
+    """Save the uploaded PDF and queue its text extraction and AI analysis."""
     attempt = get_object_or_404(Attempt, pk=attempt_id, mode="notes_quiz")
-    form = NotesUploadForm(request.POST, request.FILES)
 
-    if not form.is_valid():
-        return render(request, "recall/notes_upload.html", {
-            "attempt": attempt,
-            "form": form,
-        })
+    if hasattr(attempt, "note_upload"):
+        return redirect("recall:quiz", attempt_id=attempt.pk)
 
-    pdf_file = form.cleaned_data["notes_file"]
-
-    # Extract text from PDF
-    try:
-        reader = PdfReader(pdf_file)
-        text_parts = []
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-        extracted_text = "\n".join(text_parts)
-    except Exception as e:
-        logger.error("PDF extraction error: %s", e)
-        form.add_error("notes_file", "Could not read this PDF. Please try a different file.")
-        return render(request, "recall/notes_upload.html", {
-            "attempt": attempt,
-            "form": form,
-        })
+    form = NotesUploadForm(request.POST, request.FILES)
 
-    if not extracted_text.strip():
-        form.add_error("notes_file", "No text found in this PDF. Please upload a text-based PDF (not a scanned image).")
+    if not form.is_valid():
         return render(request, "recall/notes_upload.html", {
             "attempt": attempt,
             "form": form,
         })
 
-    # AI: extract concepts from notes
-    topic = attempt.topic
-    analysis = ai_service.extract_notes_concepts(topic, extracted_text)
-
-    if "error" in analysis:
-        covered = []
-        missing = topic.expected_concepts
-        misconceptions = []
-    else:
-        covered = analysis.get("covered_concepts", [])
-        missing = analysis.get("missing_concepts", [])
-        misconceptions = analysis.get("misconceptions", [])
-
-    # Save the upload
+    # Save the upload; text extraction and the AI calls run in the background
     note_upload = NoteUpload.objects.create(
         attempt=attempt,
-        file=pdf_file,
-        extracted_text=extracted_text,
-        extracted_concepts=covered,
+        file=form.cleaned_data["notes_file"],
+        status="processing",
     )
+    transaction.on_commit(lambda: tasks.enqueue(tasks.process_notes_upload, note_upload.pk))
 
-    # AI: generate quiz questions
-    num_questions = min(max(len(missing) + len(misconceptions), 3), 6)
-    quiz_data = ai_service.generate_quiz_questions(
-        topic, covered, missing, misconceptions, num_questions
-    )
+    return _notes_processing(request, attempt, note_upload)
 
-    if "error" in quiz_data:
-        questions = [{"question": f"Explain what you know about {topic.name}.", "target_concept": topic.name, "hint": "Think about the main ideas."}]
-    else:
-        questions = quiz_data.get("questions", [])
-
-    # Store quiz questions in session
-    request.session[f"quiz_{attempt.pk}"] = {
-        "questions": questions,
-        "current_index": 0,
-        "covered_concepts": covered,
-        "missing_concepts": missing,
-        "misconceptions": misconceptions,
-    }
 
-    # Update attempt
-    attempt.demonstrated_concepts = covered
-    attempt.missing_concepts = missing
-    attempt.identified_misconceptions = [m.get("claim", str(m)) for m in misconceptions]
-    attempt.save()
+def _notes_processing(request, attempt, note_upload):
+    """Page shown while the notes are analysed; polls notes_status until ready."""
+    return render(request, "recall/notes_processing.html", {
+        "attempt": attempt,
+        "note_upload": note_upload,
+    }, status=202)
 
-    return redirect("recall:quiz", attempt_id=attempt.pk)
+
+def notes_status(request, note_upload_id):
+    """JSON status of a notes upload, polled by the processing page."""
+    if cache.get(tasks.notes_done_key(note_upload_id)):
+        return JsonResponse({"status": "ready"})
+
+    note_upload = get_object_or_404(
+        NoteUpload.objects.only("status", "quiz_state", "uploaded_at"), pk=note_upload_id
+    )
+    tasks.expire_stale_upload(note_upload)
+    data = {"status": note_upload.status}
+    if note_upload.status == "failed":
+        data["error"] = note_upload.quiz_state.get("error", "")
+    return JsonResponse(data)
 
 
 def quiz(request, attempt_id):
     """Show the current quiz question for Mode 2."""
-    attempt = get_object_or_404(Attempt, pk=attempt_id, mode="notes_quiz")
+    attempt = _get_attempt(attempt_id, related=["note_upload"], mode="notes_quiz")
 
     if attempt.status != "active":
         return redirect("recall:summary", attempt_id=attempt.pk)
 
-    quiz_state = request.session.get(f"quiz_{attempt.pk}")
-    if not quiz_state:
+    note_upload = getattr(attempt, "note_upload", None)
+    if note_upload is not None:
+        tasks.expire_stale_upload(note_upload)
+    if note_upload is None or note_upload.status == "failed":
         return redirect("recall:notes_upload", attempt_id=attempt.pk)
+    if note_upload.status == "processing":
+        return _notes_processing(request, attempt, note_upload)
 
-    questions = quiz_state["questions"]
-    current_index = quiz_state["current_index"]
+    quiz_state = note_upload.quiz_state
+    questions = quiz_state.get("questions")
+    if not questions:
+        # Uploads from before quiz_state held the quiz have nothing to resume
+        return redirect("recall:notes_upload", attempt_id=attempt.pk)
+    current_index = quiz_state.get("current_index", 0)
 
     if current_index >= len(questions):
         # All questions answered
         attempt.status = "mastery" if attempt.mastery_met else "max_turns"
-        attempt.save()
+        attempt.save(update_fields=["status", "updated_at"])
         return redirect("recall:summary", attempt_id=attempt.pk)
 
     current_question = questions[current_index]
     form = QuizAnswerForm()
 
     # Get previous turn feedback if any
-    last_turn = attempt.turns.last()
+    turns = list(attempt.turns.all())
+    last_turn = turns[-1] if turns else None
     last_feedback = last_turn.ai_feedback if last_turn else None
 
     context = {
@@ -348,21 +392,26 @@ def quiz(request, attempt_id):
 @require_POST
 def quiz_submit(request, attempt_id):
     """Process a quiz answer."""
-    attempt = get_object_or_404(Attempt, pk=attempt_id, mode="notes_quiz")
+    attempt = _get_attempt(attempt_id, turns=False, related=["note_upload"], mode="notes_quiz")
 
     if attempt.status != "active":
         return redirect("recall:summary", attempt_id=attempt.pk)
 
-    quiz_state = request.session.get(f"quiz_{attempt.pk}")
-    if not quiz_state:
-        return redirect("recall:notes_upload", attempt_id=attempt.pk)
+    note_upload = getattr(attempt, "note_upload", None)
+    if note_upload is None or note_upload.status != "ready":
+        return redirect("recall:quiz", attempt_id=attempt.pk)
+    quiz_state = note_upload.quiz_state
 
     student_answer = request.POST.get("answer", "").strip()
     if not student_answer:
         return redirect("recall:quiz", attempt_id=attempt.pk)
 
-    questions = quiz_state["questions"]
-    current_index = quiz_state["current_index"]
+    questions = quiz_state.get("questions")
+    if not questions:
+        return redirect("recall:notes_upload", attempt_id=attempt.pk)
+    current_index = quiz_state.get("current_index", 0)
+    if current_index >= len(questions):
+        return redirect("recall:quiz", attempt_id=attempt.pk)
     current_question = questions[current_index]
 
     topic = attempt.topic
@@ -386,16 +435,6 @@ def quiz_submit(request, attempt_id):
 
     is_correct = feedback.get("is_correct", False)
 
-    # Create turn record
-    Turn.objects.create(
-        attempt=attempt,
-        turn_number=turn_number,
-        prompt=current_question["question"],
-        student_response=student_answer,
-        ai_feedback=feedback,
-        is_correct=is_correct,
-    )
-
     # Update attempt
     attempt.turn_count = turn_number
     if is_correct:
@@ -403,46 +442,65 @@ def quiz_submit(request, attempt_id):
         # Add to demonstrated if concept was actually demonstrated
         concept = current_question.get("target_concept", "")
         if concept and concept not in attempt.demonstrated_concepts:
-            demonstrated = list(attempt.demonstrated_concepts)
-            demonstrated.append(concept)
-            attempt.demonstrated_concepts = demonstrated
+            attempt.demonstrated_concepts.append(concept)
         # Remove from missing
-        missing = list(attempt.missing_concepts)
-        if concept in missing:
-            missing.remove(concept)
-            attempt.missing_concepts = missing
-
-    attempt.save()
+        if concept in attempt.missing_concepts:
+            attempt.missing_concepts.remove(concept)
 
     # Advance to next question
     quiz_state["current_index"] = current_index + 1
-    request.session[f"quiz_{attempt.pk}"] = quiz_state
-    request.session.modified = True
+
+    # Record the answer, the attempt update and quiz progress together
+    with transaction.atomic():
+        Turn.objects.create(
+            attempt=attempt,
+            turn_number=turn_number,
+            prompt=current_question["question"],
+            student_response=student_answer,
+            ai_feedback=feedback,
+            is_correct=is_correct,
+        )
+        attempt.save(update_fields=[
+            "turn_count", "correct_followups", "demonstrated_concepts", "missing_concepts", "updated_at",
+        ])
+        note_upload.save(update_fields=["quiz_state"])
 
     return redirect("recall:quiz", attempt_id=attempt.pk)
 
 
 # ─── Opt-Out & Summary ───────────────────────────────────────────────────────
 
+# Attempt.status → the headline shown on the summary page.
+SUMMARY_STATUS_MESSAGES = MappingProxyType({
+    "mastery": "🎉 Amazing! You've demonstrated strong understanding of this topic!",
+    "max_turns": "Great effort! You've completed all the rounds for this session.",
+    "opted_out": "Good job knowing when to take a break! Here's what you covered.",
+    "active": "Session in progress...",
+})
+
+
 @require_POST
 def opt_out(request, attempt_id):
     """Student clicks 'Stop here' — end session early."""
     attempt = get_object_or_404(Attempt, pk=attempt_id)
     if attempt.status == "active":
         attempt.status = "opted_out"
-        attempt.save()
+        attempt.save(update_fields=["status", "updated_at"])
     return redirect("recall:summary", attempt_id=attempt.pk)
 
 
 def summary(request, attempt_id):
     """Show the end-of-session summary page."""
-    attempt = get_object_or_404(Attempt, pk=attempt_id)
+    attempt = _get_attempt(attempt_id)
 
     # Ensure session is ended
     if attempt.status == "active":
-        attempt.check_end_condition()
+        status = attempt.evaluate_end_condition()
+        if status != attempt.status:
+            attempt.status = status
+            attempt.save(update_fields=["status", "updated_at"])
 
-    turns = attempt.turns.all()
+    turns = list(attempt.turns.all())
 
     # If student opted out before completing any rounds, skip AI summary
     if attempt.turn_count == 0:
@@ -453,6 +511,9 @@ def summary(request, attempt_id):
             "summary_text": "",
             "reflection_prompt": "",
         }
+    elif attempt.ai_summary:
+        # Already written alongside the final turn
+        ai_summary = attempt.ai_summary
     else:
         # Generate AI summary
         ai_summary = ai_service.generate_session_summary(attempt)
@@ -464,19 +525,16 @@ def summary(request, attempt_id):
                 "summary_text": "Great job working through this session! Review the concepts listed below to strengthen your understanding.",
                 "reflection_prompt": f"What was the most interesting thing you learned about {attempt.topic.name}?",
             }
-
-    status_messages = {
-        "mastery": "🎉 Amazing! You've demonstrated strong understanding of this topic!",
-        "max_turns": "Great effort! You've completed all the rounds for this session.",
-        "opted_out": "Good job knowing when to take a break! Here's what you covered.",
-        "active": "Session in progress...",
-    }
+        elif attempt.status != "active":
+            # The session is over, so keep it; reloads then skip the AI call
+            attempt.ai_summary = ai_summary
+            attempt.save(update_fields=["ai_summary", "updated_at"])
 
     context = {
         "attempt": attempt,
         "turns": turns,
         "ai_summary": ai_summary,
-        "status_message": status_messages.get(attempt.status, ""),
+        "status_message": SUMMARY_STATUS_MESSAGES.get(attempt.status, ""),
     }
     return render(request, "recall/summary.html", context)
 
@@ -485,14 +543,24 @@ def summary(request, attempt_id):
 
 def dashboard(request):
     """Simple teacher dashboard showing all attempts."""
-    attempts = Attempt.objects.select_related("topic").order_by("-created_at")[:50]
-    topics = Topic.objects.all()
+    # Only the columns the table shows; skips the per-attempt concept JSON
+    attempts = (
+        Attempt.objects.select_related("topic")
+        .only(
+            "student_name", "mode", "status", "turn_count", "created_at",
+            "topic__name", "topic__standard",
+        )
+        .order_by("-created_at")[:50]
+    )
+    stats = Attempt.objects.aggregate(
+        total=Count("id"),
+        mastery=Count("id", filter=Q(status="mastery")),
+    )
 
     context = {
         "attempts": attempts,
-        "topics": topics,
-        "total_attempts": Attempt.objects.count(),
-        "mastery_count": Attempt.objects.filter(status="mastery").count(),
+        "total_attempts": stats["total"],
+        "mastery_count": stats["mastery"],
     }
     return render(request, "recall/dashboard.html", context)
 
@@ -514,7 +582,7 @@ def transfer_challenge(request, attempt_id):
     # If we've passed level 4, session is complete
     if current_level > 4:
         attempt.status = "mastery"
-        attempt.save()
+        attempt.save(update_fields=["status", "updated_at"])
         return redirect("recall:summary", attempt_id=attempt.pk)
 
     # Get or generate a scenario for this level
@@ -639,20 +707,6 @@ def transfer_submit(request, attempt_id):
             "transfer_score": 0.3,
         }
 
-    # Create the transfer attempt record
-    transfer_attempt = TransferAttempt.objects.create(
-        attempt=attempt,
-        scenario=scenario,
-        student_response=student_response,
-        transfer_outcome=diagnosis.get("transfer_outcome", "no_transfer"),
-        concept_mappings_detected=diagnosis.get("concept_mappings_detected", []),
-        reasoning_chain=diagnosis.get("reasoning_chain", []),
-        transfer_failure_type=diagnosis.get("transfer_failure_type", "none"),
-        transfer_failure_diagnosis=diagnosis.get("transfer_failure_diagnosis", ""),
-        transfer_score=diagnosis.get("transfer_score", 0.0),
-        scaffold_count=len(scaffolds_given),
-    )
-
     # Update attempt turn count
     attempt.turn_count += 1
 
@@ -664,12 +718,11 @@ def transfer_submit(request, attempt_id):
 
         # Track demonstrated concepts from this transfer
         detected = diagnosis.get("concept_mappings_detected", [])
-        demonstrated = list(attempt.demonstrated_concepts)
+        demonstrated = attempt.demonstrated_concepts
         for mapping in detected:
             concept = mapping.get("source_concept", "")
             if concept and concept not in demonstrated:
                 demonstrated.append(concept)
-        attempt.demonstrated_concepts = demonstrated
 
         # If we've completed all 4 levels, mark as mastery
         if attempt.current_transfer_level > 4:
@@ -684,7 +737,24 @@ def transfer_submit(request, attempt_id):
             if attempt.current_transfer_level > 4:
                 attempt.status = "max_turns"
 
-    attempt.save()
+    # Record the transfer attempt and the attempt update together
+    with transaction.atomic():
+        TransferAttempt.objects.create(
+            attempt=attempt,
+            scenario=scenario,
+            student_response=student_response,
+            transfer_outcome=diagnosis.get("transfer_outcome", "no_transfer"),
+            concept_mappings_detected=diagnosis.get("concept_mappings_detected", []),
+            reasoning_chain=diagnosis.get("reasoning_chain", []),
+            transfer_failure_type=diagnosis.get("transfer_failure_type", "none"),
+            transfer_failure_diagnosis=diagnosis.get("transfer_failure_diagnosis", ""),
+            transfer_score=diagnosis.get("transfer_score", 0.0),
+            scaffold_count=len(scaffolds_given),
+        )
+        attempt.save(update_fields=[
+            "turn_count", "current_transfer_level", "correct_followups",
+            "demonstrated_concepts", "status", "updated_at",
+        ])
 
     if attempt.status != "active":
         return redirect("recall:summary", attempt_id=attempt.pk)
@@ -758,6 +828,6 @@ def transfer_scaffold(request, attempt_id):
     )
 
     last_transfer.scaffold_count = scaffold_number
-    last_transfer.save()
+    last_transfer.save(update_fields=["scaffold_count"])
 
     return redirect("recall:transfer_challenge", attempt_id=attempt.pk)